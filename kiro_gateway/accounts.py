@@ -8,17 +8,24 @@ Provides round-robin account selection and automatic token refresh.
 """
 
 import asyncio
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+import itertools
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
 
 import httpx
 from loguru import logger
-from sqlalchemy import select, update
+from sqlalchemy import DateTime, Integer, column, delete, func, or_, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import undefer, undefer_group
 
 from kiro_gateway.auth import KiroAuthManager
 from kiro_gateway.database import KiroAccount
-from kiro_gateway.config import TOKEN_REFRESH_THRESHOLD
+from kiro_gateway.config import (
+    TOKEN_REFRESH_THRESHOLD,
+    get_aws_sso_oidc_url,
+    get_kiro_refresh_url,
+)
 
 
 class AccountManager:
@@ -32,7 +39,20 @@ class AccountManager:
     - Health-aware account selection (skip invalid tokens)
     """
     
-    REFRESH_INTERVAL = 300  # Check for token refresh every 5 minutes
+    REFRESH_INTERVAL = 1800  # Safety-net sweep every 30 minutes (in-use accounts refresh inline)
+    BACKGROUND_REFRESH_THRESHOLD = 300  # Sweep only refreshes tokens within 5 minutes of expiry
+    # Used accounts refresh ahead of KiroAuthManager's own threshold, so the
+    # request path never has to refresh (and the new token is persisted)
+    INLINE_REFRESH_AHEAD = timedelta(seconds=2 * TOKEN_REFRESH_THRESHOLD)
+    FRESH_LEASE = 30.0  # Seconds a "token not near expiry" verdict is reused
+    # Failed inline refreshes are not retried for a while (doubling per failure)
+    REFRESH_FAILURE_BACKOFF = 10.0
+    REFRESH_FAILURE_BACKOFF_MAX = 300.0
+    USAGE_FLUSH_INTERVAL = 10  # Flush buffered usage stats every 10 seconds
+    REFRESH_CONCURRENCY = 4  # Max token refreshes in flight at once
+    REFRESH_PACING = 0.05  # Pause after each refresh before its slot is reused
+    EXPIRING_SOON = timedelta(seconds=600)  # Status threshold for "expiring_soon"
+    ALREADY_FRESH = "Token already refreshed"  # Sweep skipped: refreshed since it was selected
     
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         """
@@ -43,10 +63,25 @@ class AccountManager:
         """
         self.session_factory = session_factory
         self._auth_managers: Dict[int, KiroAuthManager] = {}
-        self._account_ids: List[int] = []
-        self._current_index = 0
+        # Insertion-ordered set of active account ids (dict keys): O(1) add/remove
+        self._account_ids: Dict[int, None] = {}
+        # Immutable round-robin slots of (account_id, auth_manager), read lock-free
+        # by get_next_account; rebuilt under self._lock on membership changes
+        self._slots: Tuple[Tuple[int, KiroAuthManager], ...] = ()
+        self._counter = itertools.count()
         self._lock = asyncio.Lock()
         self._refresh_task: Optional[asyncio.Task] = None
+        self._usage_flush_task: Optional[asyncio.Task] = None
+        # account_id -> (pending request count, last used time), flushed in bulk
+        self._pending_usage: Dict[int, Tuple[int, datetime]] = {}
+        # Shared keep-alive client for token refresh, created lazily
+        self._http: Optional[httpx.AsyncClient] = None
+        # account_id -> in-flight refresh task (single-flight: concurrent callers share it)
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # account_id -> monotonic deadline until which the token is known fresh
+        self._fresh_until: Dict[int, float] = {}
+        # account_id -> consecutive failed inline refreshes, drives the backoff
+        self._refresh_failures: Dict[int, int] = {}
     
     async def load_accounts(self) -> int:
         """
@@ -55,25 +90,28 @@ class AccountManager:
         Returns:
             Number of accounts loaded
         """
+        auth_managers: Dict[int, KiroAuthManager] = {}
+        
+        # Stream rows and keep only the auth managers, instead of materializing
+        # every ORM instance first
         async with self.session_factory() as session:
-            result = await session.execute(
-                select(KiroAccount).where(KiroAccount.is_active == True)
+            accounts = await session.stream_scalars(
+                select(KiroAccount)
+                .options(undefer_group("credentials"))
+                .where(KiroAccount.is_active == True)
             )
-            accounts = result.scalars().all()
+            async for account in accounts:
+                auth_managers[account.id] = self._create_auth_manager(account)
         
         async with self._lock:
-            self._auth_managers.clear()
-            self._account_ids.clear()
-            
-            for account in accounts:
-                auth_manager = self._create_auth_manager(account)
-                self._auth_managers[account.id] = auth_manager
-                self._account_ids.append(account.id)
-            
-            self._current_index = 0
-        
-        logger.info(f"Loaded {len(accounts)} accounts from database")
-        return len(accounts)
+            self._auth_managers = auth_managers
+            self._account_ids = dict.fromkeys(auth_managers)
+            self._fresh_until.clear()
+            self._refresh_failures.clear()
+            self._rebuild_snapshot()
+        
+        logger.info(f"Loaded {len(auth_managers)} accounts from database")
+        return len(auth_managers)
     
     def _create_auth_manager(self, account: KiroAccount) -> KiroAuthManager:
         """Create a KiroAuthManager from account data."""
@@ -135,14 +173,16 @@ class AccountManager:
         
         async with self.session_factory() as session:
             session.add(account)
+            # id comes back via INSERT ... RETURNING and every other default is
+            # client-side, so no refresh round-trip is needed (expire_on_commit=False)
             await session.commit()
-            await session.refresh(account)
         
         # Add to in-memory cache
         async with self._lock:
             auth_manager = self._create_auth_manager(account)
             self._auth_managers[account.id] = auth_manager
-            self._account_ids.append(account.id)
+            self._account_ids[account.id] = None
+            self._rebuild_snapshot()
         
         logger.info(f"Added account: {name} (id={account.id}, method={auth_method})")
         return account
@@ -159,69 +199,186 @@ class AccountManager:
         """
         async with self.session_factory() as session:
             result = await session.execute(
-                select(KiroAccount).where(KiroAccount.id == account_id)
+                delete(KiroAccount)
+                .where(KiroAccount.id == account_id)
+                .returning(KiroAccount.id)
             )
-            account = result.scalar_one_or_none()
-            
-            if not account:
+            if result.first() is None:
                 return False
-            
-            await session.delete(account)
             await session.commit()
         
         # Remove from in-memory cache
         async with self._lock:
-            if account_id in self._auth_managers:
-                del self._auth_managers[account_id]
-            if account_id in self._account_ids:
-                self._account_ids.remove(account_id)
-                # Reset index if needed
-                if self._current_index >= len(self._account_ids):
-                    self._current_index = 0
+            self._auth_managers.pop(account_id, None)
+            self._account_ids.pop(account_id, None)
+            self._fresh_until.pop(account_id, None)
+            self._refresh_failures.pop(account_id, None)
+            self._rebuild_snapshot()
         
         logger.info(f"Removed account id={account_id}")
         return True
     
+    def _rebuild_snapshot(self) -> None:
+        """Publish a new round-robin snapshot. Must be called under self._lock."""
+        self._slots = tuple(
+            (i, self._auth_managers[i]) for i in self._account_ids if i in self._auth_managers
+        )
+    
     async def get_next_account(self) -> Optional[KiroAuthManager]:
         """
-        Get next healthy account using round-robin.
+        Get next account using round-robin.
+        
+        Lock-free: reads the current immutable snapshot, so concurrent
+        requests never wait on account mutations.
         
         Returns:
             KiroAuthManager for the next account, or None if no accounts available
         """
-        async with self._lock:
-            if not self._account_ids:
-                return None
-            
-            # Try each account once
-            attempts = len(self._account_ids)
-            for _ in range(attempts):
-                account_id = self._account_ids[self._current_index]
-                self._current_index = (self._current_index + 1) % len(self._account_ids)
-                
-                auth_manager = self._auth_managers.get(account_id)
-                if auth_manager:
-                    # Update last used and request count
-                    asyncio.create_task(self._update_account_usage(account_id))
-                    return auth_manager
-            
+        slots = self._slots
+        if not slots:
             return None
+        
+        account_id, auth_manager = slots[next(self._counter) % len(slots)]
+        self._record_usage(account_id)
+        
+        # Skip the expiry check while a recent "fresh" verdict is still leased
+        mono_now = time.monotonic()
+        if mono_now < self._fresh_until.get(account_id, 0.0):
+            return auth_manager
+        
+        expires_at = auth_manager._expires_at
+        if expires_at is None:
+            return auth_manager
+        if expires_at - datetime.now(timezone.utc) > self.INLINE_REFRESH_AHEAD:
+            self._fresh_until[account_id] = mono_now + self.FRESH_LEASE
+        elif account_id not in self._inflight:
+            self._schedule_inline_refresh(account_id)
+        
+        return auth_manager
+    
+    def _schedule_inline_refresh(self, account_id: int) -> None:
+        """Refresh an in-use account's token in the background."""
+        
+        def _done(t: asyncio.Task) -> None:
+            if t.cancelled():
+                return
+            exc = t.exception()
+            if exc is not None:
+                logger.error(f"Inline token refresh failed for account id={account_id}: {exc}")
+            else:
+                success, message = t.result()
+                if success:
+                    self._refresh_failures.pop(account_id, None)
+                    return
+                logger.warning(f"Inline token refresh failed for account id={account_id}: {message}")
+            self._back_off_refresh(account_id)
+        
+        self._get_refresh_task(account_id).add_done_callback(_done)
     
-    async def _update_account_usage(self, account_id: int) -> None:
-        """Update account usage statistics."""
+    def _back_off_refresh(self, account_id: int) -> None:
+        """
+        Suppress inline refreshes of a failing account for a while.
+        
+        Reuses the fresh-lease map as a negative lease, so selections of a
+        broken or revoked account do not each trigger a DB read and an auth
+        request. The delay doubles per consecutive failure, up to
+        REFRESH_FAILURE_BACKOFF_MAX.
+        """
+        failures = self._refresh_failures.get(account_id, 0) + 1
+        self._refresh_failures[account_id] = failures
+        delay = min(
+            self.REFRESH_FAILURE_BACKOFF * 2 ** min(failures - 1, 16),
+            self.REFRESH_FAILURE_BACKOFF_MAX,
+        )
+        self._fresh_until[account_id] = time.monotonic() + delay
+    
+    def _get_refresh_task(
+        self,
+        account_id: int,
+        expiring_before: Optional[datetime] = None,
+    ) -> asyncio.Task:
+        """
+        Return the in-flight refresh task for account_id, starting one if needed.
+        
+        Single-flight: inline refreshes, the background sweep and manual refreshes
+        for the same account collapse into one HTTP call and one DB write.
+        
+        Args:
+            account_id: Account ID to refresh
+            expiring_before: Skip the refresh if the token (as re-read right before
+                refreshing) expires after this time
+        """
+        task = self._inflight.get(account_id)
+        if task is None:
+            task = asyncio.create_task(self._load_and_refresh_account(account_id, expiring_before))
+            self._inflight[account_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(account_id, None))
+        return task
+    
+    def _record_usage(self, account_id: int) -> None:
+        """Buffer one request for account_id; persisted by flush_usage()."""
+        count, _ = self._pending_usage.get(account_id, (0, None))
+        self._pending_usage[account_id] = (count + 1, datetime.now(timezone.utc))
+    
+    async def flush_usage(self) -> int:
+        """
+        Write buffered usage statistics to the database in one statement.
+        
+        Emits a single UPDATE ... FROM (VALUES ...) join, so PostgreSQL plans
+        and executes one statement per flush regardless of how many accounts
+        were used.
+        
+        Returns:
+            Number of accounts updated
+        """
+        if not self._pending_usage:
+            return 0
+        
+        # Swap the buffer out before awaiting so new requests go to a fresh dict
+        pending, self._pending_usage = self._pending_usage, {}
+        table = KiroAccount.__table__
+        usage = values(
+            column("id", Integer),
+            column("inc", Integer),
+            column("ts", DateTime(timezone=True)),
+            name="usage",
+        ).data([
+            (account_id, count, last_used)
+            for account_id, (count, last_used) in pending.items()
+        ])
+        stmt = (
+            update(table)
+            .where(table.c.id == usage.c.id)
+            .values(
+                request_count=table.c.request_count + usage.c.inc,
+                last_used_at=usage.c.ts,
+            )
+        )
+        
         try:
             async with self.session_factory() as session:
-                await session.execute(
-                    update(KiroAccount)
-                    .where(KiroAccount.id == account_id)
-                    .values(
-                        last_used_at=datetime.now(timezone.utc),
-                        request_count=KiroAccount.request_count + 1,
-                    )
-                )
-                await session.commit()
+                async with session.begin():
+                    await session.execute(stmt)
         except Exception as e:
-            logger.warning(f"Failed to update account usage: {e}")
+            logger.warning(f"Failed to flush account usage: {e}")
+            # Merge back so the counts are retried on the next flush
+            for account_id, (count, last_used) in pending.items():
+                newer_count, newer_used = self._pending_usage.get(account_id, (0, last_used))
+                self._pending_usage[account_id] = (count + newer_count, newer_used)
+            return 0
+        
+        return len(pending)
+    
+    async def _usage_flush_loop(self) -> None:
+        """Background task to periodically flush buffered usage stats."""
+        while True:
+            try:
+                await asyncio.sleep(self.USAGE_FLUSH_INTERVAL)
+                await self.flush_usage()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in usage flush loop: {e}")
     
     async def list_accounts(self) -> List[dict]:
         """
@@ -230,27 +387,72 @@ class AccountManager:
         Returns:
             List of account dictionaries
         """
+        # Select only the listed columns; skips ORM hydration and never loads tokens
         async with self.session_factory() as session:
-            result = await session.execute(select(KiroAccount))
-            accounts = result.scalars().all()
+            result = await session.execute(
+                select(
+                    KiroAccount.id,
+                    KiroAccount.name,
+                    KiroAccount.auth_method,
+                    KiroAccount.provider,
+                    KiroAccount.region,
+                    KiroAccount.expires_at,
+                    KiroAccount.created_at,
+                    KiroAccount.last_used_at,
+                    KiroAccount.is_active,
+                    KiroAccount.request_count,
+                    (KiroAccount.access_token != "").label("has_token"),
+                )
+            )
+            rows = result.all()
         
+        now = datetime.now(timezone.utc)
         return [
             {
-                **account.to_dict(),
-                "status": self._get_account_status(account),
+                "id": row.id,
+                "name": row.name,
+                "auth_method": row.auth_method,
+                "provider": row.provider,
+                "region": row.region,
+                "expires_at": row.expires_at.isoformat() if row.expires_at else None,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "last_used_at": row.last_used_at.isoformat() if row.last_used_at else None,
+                "is_active": row.is_active,
+                "request_count": row.request_count,
+                "status": self._status_for(row.is_active, bool(row.has_token), row.expires_at, now),
             }
-            for account in accounts
+            for row in rows
         ]
     
-    def _get_account_status(self, account: KiroAccount) -> str:
+    def _get_account_status(self, account: KiroAccount, now: Optional[datetime] = None) -> str:
         """Get human-readable account status."""
-        if not account.is_active:
+        return self._status_for(
+            account.is_active,
+            bool(account.access_token),
+            account.expires_at,
+            now or datetime.now(timezone.utc),
+        )
+    
+    @classmethod
+    def _status_for(
+        cls,
+        is_active: bool,
+        has_token: bool,
+        expires_at: Optional[datetime],
+        now: datetime,
+    ) -> str:
+        """
+        Derive account status from the columns it depends on.
+        
+        `now` is passed in so callers listing many accounts read the clock once.
+        """
+        if not is_active:
             return "inactive"
-        if not account.access_token:
+        if not has_token:
             return "no_token"
-        if not account.is_token_valid():
+        if not expires_at or expires_at <= now:
             return "expired"
-        if account.is_token_expiring_soon():
+        if expires_at - now <= cls.EXPIRING_SOON:
             return "expiring_soon"
         return "healthy"
     
@@ -258,7 +460,9 @@ class AccountManager:
         """Get a single account by ID."""
         async with self.session_factory() as session:
             result = await session.execute(
-                select(KiroAccount).where(KiroAccount.id == account_id)
+                select(KiroAccount)
+                .options(undefer(KiroAccount.access_token))
+                .where(KiroAccount.id == account_id)
             )
             account = result.scalar_one_or_none()
         
@@ -285,7 +489,7 @@ class AccountManager:
             is_active: New active status (optional)
         
         Returns:
-            True if updated successfully
+            True if updated successfully, False if the account does not exist
         """
         update_values = {"updated_at": datetime.now(timezone.utc)}
         
@@ -295,11 +499,14 @@ class AccountManager:
             update_values["is_active"] = is_active
         
         async with self.session_factory() as session:
-            await session.execute(
+            result = await session.execute(
                 update(KiroAccount)
                 .where(KiroAccount.id == account_id)
                 .values(**update_values)
+                .returning(KiroAccount.id)
             )
+            if result.first() is None:
+                return False
             await session.commit()
         
         # Update in-memory cache if is_active changed
@@ -307,14 +514,12 @@ class AccountManager:
             async with self._lock:
                 if is_active:
                     # Re-add to account_ids if not present
-                    if account_id not in self._account_ids and account_id in self._auth_managers:
-                        self._account_ids.append(account_id)
+                    if account_id in self._auth_managers:
+                        self._account_ids[account_id] = None
                 else:
                     # Remove from account_ids
-                    if account_id in self._account_ids:
-                        self._account_ids.remove(account_id)
-                        if self._current_index >= len(self._account_ids):
-                            self._current_index = 0
+                    self._account_ids.pop(account_id, None)
+                self._rebuild_snapshot()
         
         logger.info(f"Updated account id={account_id}: {update_values}")
         return True
@@ -338,7 +543,7 @@ class AccountManager:
             profile_arn: Profile ARN (optional)
         
         Returns:
-            True if updated successfully
+            True if updated successfully, False if the account does not exist
         """
         update_values = {
             "access_token": access_token,
@@ -352,17 +557,22 @@ class AccountManager:
             update_values["profile_arn"] = profile_arn
         
         async with self.session_factory() as session:
-            await session.execute(
+            result = await session.execute(
                 update(KiroAccount)
                 .where(KiroAccount.id == account_id)
                 .values(**update_values)
+                .returning(KiroAccount.id)
             )
+            if result.first() is None:
+                return False
             await session.commit()
         
         # Update in-memory cache
         async with self._lock:
-            if account_id in self._auth_managers:
-                auth_manager = self._auth_managers[account_id]
+            # New expiry: drop the leased verdict so the next selection re-checks
+            self._fresh_until.pop(account_id, None)
+            auth_manager = self._auth_managers.get(account_id)
+            if auth_manager:
                 auth_manager._access_token = access_token
                 if refresh_token:
                     auth_manager._refresh_token = refresh_token
@@ -373,6 +583,23 @@ class AccountManager:
         
         return True
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Returns or creates the shared HTTP client used for token refresh.
+        
+        All refreshes target a handful of hosts (Kiro auth / AWS OIDC per region),
+        so reusing pooled keep-alive connections avoids a TLS handshake per refresh.
+        
+        Returns:
+            Active HTTP client
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+        return self._http
+    
     async def refresh_account_token(self, account_id: int) -> tuple[bool, str]:
         """
         Refresh token for a specific account.
@@ -380,22 +607,54 @@ class AccountManager:
         For 'social' auth (Builder ID via social login): Uses Kiro's refresh endpoint
         For other auth methods (IdC, builder-id): Uses AWS SSO OIDC refresh
         
+        Concurrent calls for the same account share a single refresh.
+        
         Args:
             account_id: Account ID to refresh
             
         Returns:
             Tuple of (success: bool, message: str)
         """
+        # Shield so a cancelled caller does not cancel the refresh other callers await
+        return await asyncio.shield(self._get_refresh_task(account_id))
+    
+    async def _load_and_refresh_account(
+        self,
+        account_id: int,
+        expiring_before: Optional[datetime] = None,
+    ) -> tuple[bool, str]:
+        """
+        Load an account by ID and refresh its token.
+        
+        The row is read right before refreshing, so the refresh uses the
+        current refresh token even if another refresh rotated it meanwhile.
+        """
         # Get account info
         async with self.session_factory() as session:
             result = await session.execute(
-                select(KiroAccount).where(KiroAccount.id == account_id)
+                select(KiroAccount)
+                .options(undefer_group("credentials"))
+                .where(KiroAccount.id == account_id)
             )
             account = result.scalar_one_or_none()
         
         if not account:
             return False, "Account not found"
+        if expiring_before and account.expires_at and account.expires_at > expiring_before:
+            return True, self.ALREADY_FRESH
+        
+        return await self._refresh_loaded_account(account)
+    
+    async def _refresh_loaded_account(self, account: KiroAccount) -> tuple[bool, str]:
+        """
+        Refresh token for an already loaded account, picking the refresh flow.
         
+        Args:
+            account: KiroAccount instance
+            
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
         # If client credentials are present, use AWS SSO OIDC refresh
         # This handles cases where auth_method is "social" but credentials were created via Builder ID
         if account.client_id and account.client_secret:
@@ -423,22 +682,17 @@ class AccountManager:
         if not account.refresh_token:
             return False, "No refresh token available"
         
-        region = account.region or "us-east-1"
-        refresh_url = f"https://prod.{region}.auth.desktop.kiro.dev/refreshToken"
+        refresh_url = get_kiro_refresh_url(account.region or "us-east-1")
         
         payload = {
             "refreshToken": account.refresh_token,
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(
-                    refresh_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                data = response.json()
+            # httpx sets Content-Type: application/json for json= bodies
+            response = await self._get_http_client().post(refresh_url, json=payload)
+            response.raise_for_status()
+            data = response.json()
             
             new_access_token = data.get("accessToken")
             new_refresh_token = data.get("refreshToken")
@@ -449,11 +703,7 @@ class AccountManager:
                 return False, "No access token in response"
             
             # Calculate expiration
-            expires_at = datetime.now(timezone.utc)
-            expires_at = datetime.fromtimestamp(
-                expires_at.timestamp() + expires_in,
-                tz=timezone.utc
-            )
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
             
             # Update database
             await self.update_account_tokens(
@@ -502,8 +752,7 @@ class AccountManager:
         if not account.client_id or not account.client_secret:
             return False, "Missing client credentials. Please re-authenticate."
         
-        region = account.region or "us-east-1"
-        token_url = f"https://oidc.{region}.amazonaws.com/token"
+        token_url = get_aws_sso_oidc_url(account.region or "us-east-1")
         
         payload = {
             "clientId": account.client_id,
@@ -513,14 +762,9 @@ class AccountManager:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(
-                    token_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await self._get_http_client().post(token_url, json=payload)
+            response.raise_for_status()
+            data = response.json()
             
             new_access_token = data.get("accessToken")
             new_refresh_token = data.get("refreshToken")
@@ -530,11 +774,7 @@ class AccountManager:
                 return False, "No access token in response"
             
             # Calculate expiration
-            expires_at = datetime.now(timezone.utc)
-            expires_at = datetime.fromtimestamp(
-                expires_at.timestamp() + expires_in,
-                tz=timezone.utc
-            )
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
             
             # Update database
             await self.update_account_tokens(
@@ -565,41 +805,80 @@ class AccountManager:
             logger.error(f"IdC token refresh failed for account id={account.id}: {e}")
             return False, f"Refresh failed: {str(e)}"
     
-    async def refresh_all_tokens(self, force: bool = False) -> int:
+    async def refresh_all_tokens(
+        self,
+        force: bool = False,
+        threshold: int = TOKEN_REFRESH_THRESHOLD,
+    ) -> int:
         """
         Refresh tokens for all accounts.
         
         Args:
             force: If True, refresh all tokens regardless of expiration.
                    If False, only refresh tokens expiring soon.
+            threshold: Seconds before expiry at which a token counts as expiring soon
         
         Returns:
             Number of tokens refreshed
         """
         refreshed = 0
         
-        async with self.session_factory() as session:
-            result = await session.execute(
-                select(KiroAccount).where(KiroAccount.is_active == True)
+        cutoff = None
+        query = select(KiroAccount.id).where(KiroAccount.is_active == True)
+        if not force:
+            # Same rule as KiroAccount.is_token_expiring_soon, evaluated in SQL
+            cutoff = datetime.now(timezone.utc) + timedelta(seconds=threshold)
+            query = query.where(
+                or_(KiroAccount.expires_at.is_(None), KiroAccount.expires_at <= cutoff)
             )
-            accounts = result.scalars().all()
         
-        for account in accounts:
-            if force or account.is_token_expiring_soon(TOKEN_REFRESH_THRESHOLD):
+        # Only ids here: with bounded concurrency the last refreshes start much
+        # later, so each account is re-read right before its own refresh
+        async with self.session_factory() as session:
+            result = await session.execute(query)
+            to_refresh = result.scalars().all()
+        
+        if not to_refresh:
+            return 0
+        
+        # Refresh concurrently but bounded and paced, so a large fleet does not burst
+        # the auth endpoints or tie up DB connections needed by request traffic
+        semaphore = asyncio.Semaphore(self.REFRESH_CONCURRENCY)
+        
+        async def _refresh_one(account_id: int) -> tuple[bool, str]:
+            async with semaphore:
                 try:
-                    success, message = await self.refresh_account_token(account.id)
-                    if success:
-                        refreshed += 1
-                        logger.info(f"Refreshed token for account id={account.id}")
-                    else:
-                        logger.warning(f"Failed to refresh token for account id={account.id}: {message}")
-                except Exception as e:
-                    logger.error(f"Failed to refresh token for account id={account.id}: {e}")
+                    return await asyncio.shield(self._get_refresh_task(account_id, cutoff))
+                finally:
+                    await asyncio.sleep(self.REFRESH_PACING)
+        
+        results = await asyncio.gather(
+            *(_refresh_one(account_id) for account_id in to_refresh),
+            return_exceptions=True,
+        )
+        
+        for account_id, result in zip(to_refresh, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to refresh token for account id={account_id}: {result}")
+                continue
+            success, message = result
+            if message == self.ALREADY_FRESH:
+                continue
+            if success:
+                refreshed += 1
+                logger.info(f"Refreshed token for account id={account_id}")
+            else:
+                logger.warning(f"Failed to refresh token for account id={account_id}: {message}")
         
         return refreshed
     
     async def _auto_refresh_loop(self) -> None:
-        """Background task to auto-refresh tokens."""
+        """
+        Background safety net for token refresh.
+        
+        Accounts in use are refreshed inline by get_next_account, so this loop
+        runs rarely and only catches tokens close to hard expiry.
+        """
         # Refresh immediately on startup
         try:
             refreshed = await self.refresh_all_tokens()
@@ -611,7 +890,9 @@ class AccountManager:
         while True:
             try:
                 await asyncio.sleep(self.REFRESH_INTERVAL)
-                refreshed = await self.refresh_all_tokens()
+                refreshed = await self.refresh_all_tokens(
+                    threshold=self.BACKGROUND_REFRESH_THRESHOLD
+                )
                 if refreshed > 0:
                     logger.info(f"Auto-refreshed {refreshed} tokens")
             except asyncio.CancelledError:
@@ -620,17 +901,30 @@ class AccountManager:
                 logger.error(f"Error in auto-refresh loop: {e}")
     
     def start_auto_refresh(self) -> None:
-        """Start background task to auto-refresh tokens."""
+        """Start background tasks to auto-refresh tokens and flush usage stats."""
         if self._refresh_task is None:
             self._refresh_task = asyncio.create_task(self._auto_refresh_loop())
             logger.info("Started auto-refresh background task")
+        if self._usage_flush_task is None:
+            self._usage_flush_task = asyncio.create_task(self._usage_flush_loop())
     
     def stop_auto_refresh(self) -> None:
-        """Stop background refresh task."""
+        """Stop background refresh and usage flush tasks."""
         if self._refresh_task:
             self._refresh_task.cancel()
             self._refresh_task = None
             logger.info("Stopped auto-refresh background task")
+        if self._usage_flush_task:
+            self._usage_flush_task.cancel()
+            self._usage_flush_task = None
+    
+    async def aclose(self) -> None:
+        """Flush pending state and close the HTTP client. Call after stop_auto_refresh()."""
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        await self.flush_usage()
+        if self._http and not self._http.is_closed:
+            await self._http.aclose()
     
     @property
     def account_count(self) -> int:
@@ -641,8 +935,6 @@ class AccountManager:
         """Get total request count across all accounts."""
         async with self.session_factory() as session:
             result = await session.execute(
-                select(KiroAccount)
+                select(func.coalesce(func.sum(KiroAccount.request_count), 0))
             )
-            accounts = result.scalars().all()
-        
-        return sum(account.request_count for account in accounts)
+            return result.scalar_one()
@@ -3,34 +3,159 @@
 """
 API Keys management for Kiro Gateway.
 
-Provides multi-key authentication system with local JSON storage
+Provides multi-key authentication system with local JSON storage,
+a shared SQLite database when API_KEYS_SQLITE_FILE is set,
 or PostgreSQL when DATABASE_URL is configured.
 """
 
+import atexit
+import bisect
+import functools
 import json
 import os
 import secrets
 import string
+import sys
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Protocol
+from typing import Dict, List, Optional, Protocol, Set, Tuple
 
 from loguru import logger
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    column,
+    create_engine,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    update,
+    values,
+)
+
+# orjson is optional: much faster (de)serialization of the key store
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 DEFAULT_API_KEYS_FILE = "api_keys.json"
 
+# How long a successful validation is trusted before stats are written again
+VALIDATION_CACHE_TTL = 60.0
+
+# Mutations are coalesced and written to disk at most once per interval
+SAVE_DEBOUNCE_INTERVAL = 2.0
+
+# list_keys() results are reused for this long unless keys were modified
+LIST_CACHE_TTL = 2.0
+
+# Skip fsync when saving api_keys.json (faster bulk loads, not crash-safe)
+API_KEYS_NO_SYNC: bool = os.getenv("API_KEYS_NO_SYNC", "").lower() in ("true", "1", "yes", "on")
+
+# SQLite database shared by all worker processes (replaces api_keys.json when set)
+API_KEYS_SQLITE_FILE: str = os.getenv("API_KEYS_SQLITE_FILE", "")
+
+# Cached PostgreSQL key counts are re-read after this long (other workers may write)
+KEY_COUNT_RESYNC_INTERVAL = 30.0
+
+# Buffered PostgreSQL usage stats are written in one statement per interval
+USAGE_FLUSH_INTERVAL = 5.0
+
+
+API_KEY_RANDOM_LENGTH = 48
+
+# Name given to keys stored without one
+UNNAMED_KEY_NAME = "Unnamed Key"
+
+# Keys created in an empty database store
+DEFAULT_KEY_NAMES = ("Default Key 1", "Default Key 2")
+
+# Random bytes are mapped onto [A-Za-z0-9] with one bytes.translate() call.
+# Bytes >= 248 (= 4 * 62) are dropped so every character stays equally likely.
+_KEY_ALPHABET = (string.ascii_letters + string.digits).encode("ascii")
+_KEY_BYTE_TABLE = bytes(_KEY_ALPHABET[i % len(_KEY_ALPHABET)] for i in range(256))
+_KEY_REJECTED_BYTES = bytes(range(256 - 256 % len(_KEY_ALPHABET), 256))
+
 
 def generate_api_key(prefix: str = "sk-") -> str:
     """Generate an OpenAI-style API key."""
-    chars = string.ascii_letters + string.digits
-    random_part = ''.join(secrets.choice(chars) for _ in range(48))
-    return f"{prefix}{random_part}"
+    random_part = b""
+    while len(random_part) < API_KEY_RANDOM_LENGTH:
+        random_part += secrets.token_bytes(64).translate(_KEY_BYTE_TABLE, _KEY_REJECTED_BYTES)
+    return prefix + random_part[:API_KEY_RANDOM_LENGTH].decode("ascii")
+
+
+_API_KEY_PREFIX = "sk-"
+_API_KEY_LENGTH = len(_API_KEY_PREFIX) + API_KEY_RANDOM_LENGTH
+
+
+def _is_well_formed_key(key: str) -> bool:
+    """Cheap format check run before any storage lookup."""
+    return (
+        len(key) == _API_KEY_LENGTH
+        and key.startswith(_API_KEY_PREFIX)
+        and key.isascii()
+        and key[len(_API_KEY_PREFIX):].isalnum()
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_datetime(val: str) -> Optional[datetime]:
+    """Parse a stored ISO timestamp (memoized: many keys share timestamps)."""
+    try:
+        if val[-1] == 'Z':
+            return datetime.fromisoformat(val[:-1] + '+00:00')
+        return datetime.fromisoformat(val)
+    except ValueError:
+        return None
+
+
+def _parse_datetime(val) -> Optional[datetime]:
+    """Parse a datetime from storage, which may already be a datetime."""
+    if not val:
+        return None
+    if isinstance(val, datetime):
+        return val
+    if not isinstance(val, str):
+        return None
+    return _parse_iso_datetime(val)
+
+
+def _as_utc(val: Optional[datetime]) -> Optional[datetime]:
+    """Attach UTC to a naive timestamp (SQLite drops the zone on storage)."""
+    if val is not None and val.tzinfo is None:
+        return val.replace(tzinfo=timezone.utc)
+    return val
 
 
 class APIKey:
     """API Key model."""
     
+    __slots__ = (
+        "key",
+        "name",
+        "created_at",
+        "last_used_at",
+        "is_active",
+        "request_count",
+        "_masked",
+        "_created_iso",
+        "_last_used_src",
+        "_last_used_iso",
+    )
+    
     def __init__(
         self,
         key: str,
@@ -41,23 +166,34 @@ class APIKey:
         request_count: int = 0,
     ):
         self.key = key
-        self.name = name
+        # Names repeat a lot ("Default Key 1", ...); share one string object.
+        # A stored "name": null must not fail the load of the whole key file.
+        self.name = sys.intern(name) if isinstance(name, str) else UNNAMED_KEY_NAME
         self.created_at = created_at or datetime.now(timezone.utc)
         self.last_used_at = last_used_at
         self.is_active = is_active
         self.request_count = request_count
+        # key and created_at never change, so their display forms are built once
+        self._masked = key[:7] + "..." + key[-4:] if len(key) > 8 else key
+        self._created_iso = self.created_at.isoformat()
+        self._last_used_src: Optional[datetime] = None
+        self._last_used_iso: Optional[str] = None
+    
+    def _last_used_isoformat(self) -> Optional[str]:
+        """ISO string for last_used_at, re-formatted only when it changed."""
+        last_used_at = self.last_used_at
+        if last_used_at is not self._last_used_src:
+            self._last_used_src = last_used_at
+            self._last_used_iso = last_used_at.isoformat() if last_used_at else None
+        return self._last_used_iso
     
     def to_dict(self, mask_key: bool = True) -> dict:
         """Convert to dictionary."""
-        key_display = self.key
-        if mask_key and len(self.key) > 8:
-            key_display = self.key[:7] + "..." + self.key[-4:]
-        
         return {
-            "key": key_display,
+            "key": self._masked if mask_key else self.key,
             "name": self.name,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "last_used_at": self.last_used_at.isoformat() if self.last_used_at else None,
+            "created_at": self._created_iso,
+            "last_used_at": self._last_used_isoformat(),
             "is_active": self.is_active,
             "request_count": self.request_count,
         }
@@ -67,8 +203,8 @@ class APIKey:
         return {
             "key": self.key,
             "name": self.name,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "last_used_at": self.last_used_at.isoformat() if self.last_used_at else None,
+            "created_at": self._created_iso,
+            "last_used_at": self._last_used_isoformat(),
             "is_active": self.is_active,
             "request_count": self.request_count,
         }
@@ -76,23 +212,11 @@ class APIKey:
     @classmethod
     def from_storage_dict(cls, data: dict) -> "APIKey":
         """Create from storage dictionary."""
-        def parse_datetime(val):
-            if not val:
-                return None
-            if isinstance(val, datetime):
-                return val
-            try:
-                if val.endswith('Z'):
-                    return datetime.fromisoformat(val.replace('Z', '+00:00'))
-                return datetime.fromisoformat(val)
-            except:
-                return None
-        
         return cls(
             key=data.get("key", ""),
-            name=data.get("name", "Unnamed Key"),
-            created_at=parse_datetime(data.get("created_at")),
-            last_used_at=parse_datetime(data.get("last_used_at")),
+            name=data.get("name", UNNAMED_KEY_NAME),
+            created_at=_parse_datetime(data.get("created_at")),
+            last_used_at=_parse_datetime(data.get("last_used_at")),
             is_active=data.get("is_active", True),
             request_count=data.get("request_count", 0),
         )
@@ -111,6 +235,7 @@ class APIKeyManagerProtocol(Protocol):
     def key_count(self) -> int: ...
     @property
     def active_key_count(self) -> int: ...
+    def count_keys(self) -> Tuple[int, int]: ...
 
 
 class LocalAPIKeyManager:
@@ -121,17 +246,72 @@ class LocalAPIKeyManager:
     def __init__(self, storage_file: str = DEFAULT_API_KEYS_FILE):
         self.storage_file = Path(storage_file)
         self._keys: Dict[str, APIKey] = {}  # key -> APIKey
+        self._sorted_keys: List[str] = []  # sorted key strings, for prefix lookups
+        self._active: Set[str] = set()  # active key strings, the validation hot path
+        self._valid_cache: Dict[str, float] = {}  # key -> monotonic expiry of last validation
+        self._dirty = threading.Event()
+        self._save_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._version = 0  # bumped on every change, invalidates the list cache
+        self._list_cache: Dict[bool, tuple] = {}  # mask -> (version, expiry, result)
         self._load_from_file()
+        atexit.register(self.flush)
+    
+    def _mark_dirty(self) -> None:
+        """Schedule a coalesced save by the background writer."""
+        self._version += 1
+        self._schedule_save()
+    
+    def _schedule_save(self) -> None:
+        """Wake the background writer without invalidating the list cache."""
+        self._dirty.set()
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="api-keys-writer", daemon=True
+            )
+            self._writer.start()
+    
+    def _writer_loop(self) -> None:
+        """Background writer: wait for changes, let them accumulate, save once."""
+        while True:
+            self._dirty.wait()
+            time.sleep(SAVE_DEBOUNCE_INTERVAL)
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write pending changes to disk now (also called at interpreter exit)."""
+        with self._save_lock:
+            if not self._dirty.is_set():
+                return
+            self._dirty.clear()
+            self._save_to_file()
     
     def _save_to_file(self) -> None:
-        """Save keys to JSON file."""
+        """
+        Save keys to JSON file.
+        
+        Writes a temp file, fsyncs it once and renames it over the target, so a
+        crash mid-write never leaves a truncated api_keys.json behind.
+        """
         try:
+            # Snapshot first: request threads may add/remove keys meanwhile
+            api_keys = list(self._keys.values())
             data = {
-                "keys": [key.to_storage_dict() for key in self._keys.values()]
+                "keys": [key.to_storage_dict() for key in api_keys]
             }
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved {len(self._keys)} API keys to {self.storage_file}")
+            if orjson is not None:
+                payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+            
+            tmp_file = self.storage_file.with_suffix(self.storage_file.suffix + '.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+                if not API_KEYS_NO_SYNC:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_file, self.storage_file)
+            logger.debug(f"Saved {len(api_keys)} API keys to {self.storage_file}")
         except Exception as e:
             logger.error(f"Failed to save API keys: {e}")
     
@@ -143,13 +323,16 @@ class LocalAPIKeyManager:
             return
         
         try:
-            with open(self.storage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.storage_file, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
             keys_data = data.get("keys", [])
             for key_data in keys_data:
                 api_key = APIKey.from_storage_dict(key_data)
                 self._keys[api_key.key] = api_key
+            self._sorted_keys = sorted(self._keys)
+            self._active = {k for k, api_key in self._keys.items() if api_key.is_active}
             
             logger.info(f"Loaded {len(self._keys)} API keys from {self.storage_file}")
             
@@ -184,15 +367,22 @@ class LocalAPIKeyManager:
         key_str = generate_api_key("sk-")
         api_key = APIKey(key=key_str, name=name)
         self._keys[key_str] = api_key
-        self._save_to_file()
+        bisect.insort(self._sorted_keys, key_str)
+        self._active.add(key_str)
+        self._mark_dirty()
         logger.info(f"Created API key: {name}")
         return api_key
     
     def delete_key(self, key: str) -> bool:
         """Delete an API key."""
-        if key in self._keys:
-            del self._keys[key]
-            self._save_to_file()
+        api_key = self._keys.pop(key, None)
+        if api_key is not None:
+            self._active.discard(key)
+            self._valid_cache.pop(key, None)
+            index = bisect.bisect_left(self._sorted_keys, key)
+            if index < len(self._sorted_keys) and self._sorted_keys[index] == key:
+                del self._sorted_keys[index]
+            self._mark_dirty()
             logger.info(f"Deleted API key")
             return True
         return False
@@ -202,22 +392,50 @@ class LocalAPIKeyManager:
         return self._keys.get(key)
     
     def validate_key(self, key: str) -> bool:
-        """Validate an API key and update usage stats."""
-        api_key = self._keys.get(key)
-        if not api_key:
+        """
+        Validate an API key and update usage stats.
+        
+        Recently validated keys skip the last_used_at update and the list
+        cache invalidation; their counter bump is written by the next
+        coalesced save.
+        """
+        if not _is_well_formed_key(key):
             return False
-        if not api_key.is_active:
+        
+        # Unknown and disabled keys are rejected by one set lookup
+        if key not in self._active:
             return False
         
+        api_key = self._keys[key]
+        now = time.monotonic()
+        if now < self._valid_cache.get(key, 0.0):
+            api_key.request_count += 1
+            self._schedule_save()
+            return True
+        
         # Update usage stats
         api_key.last_used_at = datetime.now(timezone.utc)
         api_key.request_count += 1
-        self._save_to_file()
+        self._mark_dirty()
+        self._valid_cache[key] = now + VALIDATION_CACHE_TTL
         return True
     
     def list_keys(self, mask: bool = True) -> List[dict]:
-        """List all API keys."""
-        return [key.to_dict(mask_key=mask) for key in self._keys.values()]
+        """
+        List all API keys.
+        
+        The result is reused while no key changed and LIST_CACHE_TTL has not
+        passed (the TTL bounds staleness of request counters), so UI polling
+        does not rebuild every dict.
+        """
+        now = time.monotonic()
+        cached = self._list_cache.get(mask)
+        if cached is not None and cached[0] == self._version and now < cached[1]:
+            return cached[2]
+        
+        result = [key.to_dict(mask_key=mask) for key in self._keys.values()]
+        self._list_cache[mask] = (self._version, now + LIST_CACHE_TTL, result)
+        return result
     
     def update_key(self, key: str, name: Optional[str] = None, is_active: Optional[bool] = None) -> bool:
         """Update an API key."""
@@ -226,18 +444,24 @@ class LocalAPIKeyManager:
             return False
         
         if name is not None:
-            api_key.name = name
+            api_key.name = sys.intern(name)
         if is_active is not None:
             api_key.is_active = is_active
+            if is_active:
+                self._active.add(key)
+            else:
+                self._active.discard(key)
+                self._valid_cache.pop(key, None)
         
-        self._save_to_file()
+        self._mark_dirty()
         return True
     
     def get_key_by_prefix(self, prefix: str) -> Optional[APIKey]:
         """Find a key by its prefix (for display purposes)."""
-        for key, api_key in self._keys.items():
-            if key.startswith(prefix):
-                return api_key
+        # The first sorted key >= prefix is the only candidate that can match
+        index = bisect.bisect_left(self._sorted_keys, prefix)
+        if index < len(self._sorted_keys) and self._sorted_keys[index].startswith(prefix):
+            return self._keys.get(self._sorted_keys[index])
         return None
     
     @property
@@ -248,33 +472,39 @@ class LocalAPIKeyManager:
     @property
     def active_key_count(self) -> int:
         """Get number of active keys."""
-        return sum(1 for k in self._keys.values() if k.is_active)
+        return len(self._active)
+    
+    def count_keys(self) -> Tuple[int, int]:
+        """Get current (total, active) key counts."""
+        return len(self._keys), len(self._active)
 
 
-class PostgresAPIKeyManager:
+class _SQLAPIKeyManager:
     """
-    Manages API keys with PostgreSQL storage.
+    Shared SQLAlchemy Core implementation of the database-backed key stores.
     Uses synchronous database operations for compatibility.
+    
+    Subclasses provide the engine and the bulk usage UPDATE, which differ
+    between PostgreSQL and SQLite.
     """
     
+    _backend_name = ""
+    
     def __init__(self):
         self._engine = None
+        # (total, active) key counts, kept in step with local writes
+        self._counts = (0, 0)
+        self._counts_synced_at: Optional[float] = None
+        # key -> (pending request count, last used time), flushed in bulk
+        self._pending_stats: Dict[str, tuple] = {}
+        self._stats_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
         self._init_db()
+        atexit.register(self.flush_usage)
     
     def _init_db(self) -> None:
         """Initialize database connection and create table."""
-        from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, MetaData, Table
-        from sqlalchemy.orm import sessionmaker
-        
-        database_url = os.getenv("DATABASE_URL", "")
-        # Convert async URL to sync if needed
-        if database_url.startswith("postgresql+asyncpg://"):
-            database_url = database_url.replace("postgresql+asyncpg://", "postgresql://")
-        elif database_url.startswith("postgres://"):
-            database_url = database_url.replace("postgres://", "postgresql://")
-        
-        self._engine = create_engine(database_url, pool_pre_ping=True)
-        self._Session = sessionmaker(bind=self._engine)
+        self._engine = self._create_engine()
         
         # Create table if not exists
         metadata = MetaData()
@@ -288,207 +518,443 @@ class PostgresAPIKeyManager:
             Column('is_active', Boolean, default=True),
             Column('request_count', Integer, default=0),
         )
+        self._prepare_storage(metadata)
+    
+    def _create_engine(self):
+        """Create the SQLAlchemy engine."""
+        raise NotImplementedError
+    
+    def _prepare_storage(self, metadata: MetaData) -> None:
+        """Create the table if needed and seed default keys into an empty store."""
         metadata.create_all(self._engine)
-        
-        # Check if we need to create default keys
         self._ensure_default_keys()
     
     def _ensure_default_keys(self) -> None:
         """Create default keys if none exist."""
         if self.key_count == 0:
-            logger.info("Creating default API keys in PostgreSQL...")
-            key1 = self.create_key("Default Key 1")
-            key2 = self.create_key("Default Key 2")
-            
-            logger.info("=" * 60)
-            logger.info("  AUTO-GENERATED API KEYS (PostgreSQL)")
-            logger.info("=" * 60)
-            logger.info(f"  Key 1: {key1.key}")
-            logger.info(f"  Key 2: {key2.key}")
-            logger.info("=" * 60)
-            logger.info("  Use these keys as 'api_key' when connecting clients")
-            logger.info("  You can manage keys in the WebUI at /ui -> API Keys")
-            logger.info("=" * 60)
+            logger.info(f"Creating default API keys in {self._backend_name}...")
+            self._log_default_keys(self.create_keys(list(DEFAULT_KEY_NAMES)))
+    
+    def _log_default_keys(self, api_keys: List[APIKey]) -> None:
+        """Print freshly generated default keys so the operator can use them."""
+        logger.info("=" * 60)
+        logger.info(f"  AUTO-GENERATED API KEYS ({self._backend_name})")
+        logger.info("=" * 60)
+        for number, api_key in enumerate(api_keys, 1):
+            logger.info(f"  Key {number}: {api_key.key}")
+        logger.info("=" * 60)
+        logger.info("  Use these keys as 'api_key' when connecting clients")
+        logger.info("  You can manage keys in the WebUI at /ui -> API Keys")
+        logger.info("=" * 60)
     
     def create_key(self, name: str) -> APIKey:
         """Create a new API key."""
-        from sqlalchemy import insert
-        
-        key_str = generate_api_key("sk-")
-        now = datetime.now(timezone.utc)
+        return self.create_keys([name])[0]
+    
+    def create_keys(self, names: List[str]) -> List[APIKey]:
+        """Create several API keys in one INSERT and one transaction."""
+        with self._engine.begin() as conn:
+            api_keys = self._insert_new_keys(conn, names)
         
-        with self._Session() as session:
-            stmt = insert(self._api_keys_table).values(
-                key=key_str,
-                name=name,
-                created_at=now,
-                is_active=True,
-                request_count=0,
-            )
-            session.execute(stmt)
-            session.commit()
+        if self._counts_synced_at is not None:
+            total, active = self._counts
+            self._counts = (total + len(api_keys), active + len(api_keys))
         
-        logger.info(f"Created API key in PostgreSQL: {name}")
-        return APIKey(key=key_str, name=name, created_at=now)
+        for api_key in api_keys:
+            logger.info(f"Created API key in {self._backend_name}: {api_key.name}")
+        return api_keys
+    
+    def _insert_new_keys(self, conn, names: List[str]) -> List[APIKey]:
+        """Generate keys with the given names and insert them on conn."""
+        now = datetime.now(timezone.utc)
+        api_keys = [
+            APIKey(key=generate_api_key("sk-"), name=name, created_at=now)
+            for name in names
+        ]
+        self._insert_keys(conn, api_keys)
+        return api_keys
+    
+    def _insert_keys(self, conn, api_keys: List[APIKey]) -> None:
+        """Insert APIKey objects with one executemany INSERT."""
+        conn.execute(
+            insert(self._api_keys_table),
+            [
+                {
+                    "key": api_key.key,
+                    "name": api_key.name,
+                    "created_at": api_key.created_at,
+                    "last_used_at": api_key.last_used_at,
+                    "is_active": api_key.is_active,
+                    "request_count": api_key.request_count,
+                }
+                for api_key in api_keys
+            ],
+        )
     
     def delete_key(self, key: str) -> bool:
         """Delete an API key."""
-        from sqlalchemy import delete
+        stmt = delete(self._api_keys_table).where(
+            self._api_keys_table.c.key == key
+        ).returning(self._api_keys_table.c.is_active)
+        with self._engine.begin() as conn:
+            row = conn.execute(stmt).first()
         
-        with self._Session() as session:
-            stmt = delete(self._api_keys_table).where(self._api_keys_table.c.key == key)
-            result = session.execute(stmt)
-            session.commit()
-            return result.rowcount > 0
+        if row is None:
+            return False
+        if self._counts_synced_at is not None:
+            total, active = self._counts
+            self._counts = (total - 1, active - 1 if row.is_active else active)
+        return True
     
     def get_key(self, key: str) -> Optional[APIKey]:
         """Get an API key by its value."""
-        from sqlalchemy import select
-        
-        with self._Session() as session:
-            stmt = select(self._api_keys_table).where(self._api_keys_table.c.key == key)
-            result = session.execute(stmt).fetchone()
-            if result:
-                return APIKey(
-                    key=result.key,
-                    name=result.name,
-                    created_at=result.created_at,
-                    last_used_at=result.last_used_at,
-                    is_active=result.is_active,
-                    request_count=result.request_count,
-                )
-        return None
+        stmt = select(self._api_keys_table).where(self._api_keys_table.c.key == key)
+        with self._engine.connect() as conn:
+            row = conn.execute(stmt).first()
+        return self._row_to_api_key(row) if row else None
+    
+    @staticmethod
+    def _row_to_api_key(row) -> APIKey:
+        """Build an APIKey from an api_keys table row."""
+        return APIKey(
+            key=row.key,
+            name=row.name,
+            created_at=_as_utc(row.created_at),
+            last_used_at=_as_utc(row.last_used_at),
+            is_active=row.is_active,
+            request_count=row.request_count,
+        )
     
     def validate_key(self, key: str) -> bool:
-        """Validate an API key and update usage stats."""
-        from sqlalchemy import select, update
+        """
+        Validate an API key and update usage stats.
         
-        with self._Session() as session:
-            stmt = select(self._api_keys_table).where(self._api_keys_table.c.key == key)
-            result = session.execute(stmt).fetchone()
-            
-            if not result or not result.is_active:
+        Every call checks the key against the database (one indexed lookup),
+        so a key deleted or deactivated by any worker is rejected at once.
+        Only the usage stats are buffered in memory and written by
+        flush_usage().
+        """
+        # Malformed keys (scanners, misconfigured clients) never reach the database
+        if not _is_well_formed_key(key):
+            return False
+        
+        table = self._api_keys_table
+        stmt = select(table.c.id).where(
+            (table.c.key == key) & (table.c.is_active == True)
+        )
+        with self._engine.connect() as conn:
+            if conn.execute(stmt).first() is None:
                 return False
-            
-            # Update usage stats
-            update_stmt = update(self._api_keys_table).where(
-                self._api_keys_table.c.key == key
-            ).values(
-                last_used_at=datetime.now(timezone.utc),
-                request_count=result.request_count + 1,
+        
+        with self._stats_lock:
+            count, _ = self._pending_stats.get(key, (0, None))
+            self._pending_stats[key] = (count + 1, datetime.now(timezone.utc))
+        self._ensure_flusher()
+        return True
+    
+    def _ensure_flusher(self) -> None:
+        """Start the background usage flusher on first use."""
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="api-keys-usage-flusher", daemon=True
             )
-            session.execute(update_stmt)
-            session.commit()
-            return True
+            self._flusher.start()
+    
+    def _flush_loop(self) -> None:
+        """Background task to periodically flush buffered usage stats."""
+        while True:
+            time.sleep(USAGE_FLUSH_INTERVAL)
+            try:
+                self.flush_usage()
+            except Exception as e:
+                logger.error(f"Error in API key usage flush loop: {e}")
+    
+    def flush_usage(self) -> int:
+        """
+        Write buffered usage stats in a single transaction.
+        
+        Returns:
+            Number of keys updated
+        """
+        with self._stats_lock:
+            if not self._pending_stats:
+                return 0
+            pending, self._pending_stats = self._pending_stats, {}
+        
+        try:
+            with self._engine.begin() as conn:
+                self._write_usage(conn, pending)
+        except Exception as e:
+            logger.warning(f"Failed to flush API key usage: {e}")
+            # Merge back so the counts are retried on the next flush
+            with self._stats_lock:
+                for key, (count, ts) in pending.items():
+                    newer_count, newer_ts = self._pending_stats.get(key, (0, ts))
+                    self._pending_stats[key] = (count + newer_count, newer_ts)
+            return 0
+        
+        return len(pending)
+    
+    def _write_usage(self, conn, pending: Dict[str, tuple]) -> None:
+        """Apply buffered usage stats in one statement."""
+        raise NotImplementedError
     
     def list_keys(self, mask: bool = True) -> List[dict]:
         """List all API keys."""
-        from sqlalchemy import select
-        
-        with self._Session() as session:
-            stmt = select(self._api_keys_table)
-            results = session.execute(stmt).fetchall()
-            
-            keys = []
-            for row in results:
-                api_key = APIKey(
-                    key=row.key,
-                    name=row.name,
-                    created_at=row.created_at,
-                    last_used_at=row.last_used_at,
-                    is_active=row.is_active,
-                    request_count=row.request_count,
-                )
-                keys.append(api_key.to_dict(mask_key=mask))
-            return keys
+        with self._engine.connect() as conn:
+            rows = conn.execute(select(self._api_keys_table)).all()
+        return [self._row_to_api_key(row).to_dict(mask_key=mask) for row in rows]
     
     def update_key(self, key: str, name: Optional[str] = None, is_active: Optional[bool] = None) -> bool:
         """Update an API key."""
-        from sqlalchemy import update
-        
-        values = {}
+        changes = {}
         if name is not None:
-            values['name'] = name
+            changes['name'] = name
         if is_active is not None:
-            values['is_active'] = is_active
+            changes['is_active'] = is_active
         
-        if not values:
+        if not changes:
             return True
         
-        with self._Session() as session:
-            stmt = update(self._api_keys_table).where(
-                self._api_keys_table.c.key == key
-            ).values(**values)
-            result = session.execute(stmt)
-            session.commit()
-            return result.rowcount > 0
+        stmt = update(self._api_keys_table).where(
+            self._api_keys_table.c.key == key
+        ).values(**changes)
+        with self._engine.begin() as conn:
+            result = conn.execute(stmt)
+        
+        if is_active is not None:
+            # Previous state is unknown here; re-count on next access
+            self._counts_synced_at = None
+        return result.rowcount > 0
     
     def get_key_by_prefix(self, prefix: str) -> Optional[APIKey]:
         """Find a key by its prefix."""
-        from sqlalchemy import select
+        # The range predicate lets the planner use the B-tree index on key;
+        # it is only an exact prefix match under bytewise (C) collation, so
+        # the LIKE filter keeps the result correct under other collations
+        key_column = self._api_keys_table.c.key
+        stmt = select(self._api_keys_table).where(
+            key_column >= prefix,
+            key_column < prefix + "\uffff",
+            key_column.startswith(prefix, autoescape=True),
+        ).limit(1)
+        with self._engine.connect() as conn:
+            row = conn.execute(stmt).first()
+        return self._row_to_api_key(row) if row else None
+    
+    def _get_counts(self, fresh: bool = False) -> tuple:
+        """
+        Return cached (total, active) key counts.
         
-        with self._Session() as session:
-            stmt = select(self._api_keys_table).where(
-                self._api_keys_table.c.key.like(f"{prefix}%")
-            )
-            result = session.execute(stmt).fetchone()
-            if result:
-                return APIKey(
-                    key=result.key,
-                    name=result.name,
-                    created_at=result.created_at,
-                    last_used_at=result.last_used_at,
-                    is_active=result.is_active,
-                    request_count=result.request_count,
-                )
-        return None
+        Both counts come from one query, re-run only after
+        KEY_COUNT_RESYNC_INTERVAL, when a local write invalidated them,
+        or when fresh is set.
+        """
+        now = time.monotonic()
+        if (
+            fresh
+            or self._counts_synced_at is None
+            or now - self._counts_synced_at >= KEY_COUNT_RESYNC_INTERVAL
+        ):
+            table = self._api_keys_table
+            stmt = select(
+                func.count(),
+                func.count().filter(table.c.is_active == True),
+            ).select_from(table)
+            with self._engine.connect() as conn:
+                total, active = conn.execute(stmt).one()
+            self._counts = (total or 0, active or 0)
+            self._counts_synced_at = now
+        return self._counts
     
     @property
     def key_count(self) -> int:
         """Get number of keys."""
-        from sqlalchemy import select, func
-        
-        with self._Session() as session:
-            stmt = select(func.count()).select_from(self._api_keys_table)
-            return session.execute(stmt).scalar() or 0
+        return self._get_counts()[0]
     
     @property
     def active_key_count(self) -> int:
         """Get number of active keys."""
-        from sqlalchemy import select, func
+        return self._get_counts()[1]
+    
+    def count_keys(self) -> Tuple[int, int]:
+        """
+        Get current (total, active) key counts straight from the database.
         
-        with self._Session() as session:
-            stmt = select(func.count()).select_from(self._api_keys_table).where(
-                self._api_keys_table.c.is_active == True
-            )
-            return session.execute(stmt).scalar() or 0
+        Other workers may have changed keys since the cached counts were
+        taken, so checks that must not act on stale counts use this.
+        """
+        return self._get_counts(fresh=True)
+
+
+class PostgresAPIKeyManager(_SQLAPIKeyManager):
+    """
+    Manages API keys with PostgreSQL storage.
+    """
+    
+    _backend_name = "PostgreSQL"
+    
+    def _create_engine(self):
+        """Create the SQLAlchemy engine from DATABASE_URL."""
+        database_url = os.getenv("DATABASE_URL", "")
+        # Convert async URL to sync if needed
+        if database_url.startswith("postgresql+asyncpg://"):
+            database_url = database_url.replace("postgresql+asyncpg://", "postgresql://")
+        elif database_url.startswith("postgres://"):
+            database_url = database_url.replace("postgres://", "postgresql://")
+        
+        # Sized for concurrent request threads validating keys and admin calls
+        return create_engine(
+            database_url,
+            pool_pre_ping=True,
+            pool_size=20,
+            max_overflow=10,
+        )
+    
+    def _write_usage(self, conn, pending: Dict[str, tuple]) -> None:
+        """Apply buffered usage stats in one UPDATE ... FROM (VALUES ...) join."""
+        table = self._api_keys_table
+        usage = values(
+            column("key", String),
+            column("delta", Integer),
+            column("ts", DateTime(timezone=True)),
+            name="usage",
+        ).data([(key, count, ts) for key, (count, ts) in pending.items()])
+        stmt = update(table).where(table.c.key == usage.c.key).values(
+            request_count=table.c.request_count + usage.c.delta,
+            last_used_at=usage.c.ts,
+        )
+        conn.execute(stmt)
 
 
-# Global instance
-_api_key_manager: Optional[APIKeyManagerProtocol] = None
+class SQLiteAPIKeyManager(_SQLAPIKeyManager):
+    """
+    Manages API keys in a local SQLite database.
+    
+    Unlike api_keys.json, which every worker process rewrites from its own
+    in-memory copy, the database file is shared: all workers see the same
+    keys and usage counters. WAL mode lets readers run alongside the single
+    writer, and each commit appends to the log instead of rewriting the store.
+    """
+    
+    _backend_name = "SQLite"
+    
+    def __init__(
+        self,
+        db_file: str = API_KEYS_SQLITE_FILE,
+        import_file: str = DEFAULT_API_KEYS_FILE,
+    ):
+        self.db_file = Path(db_file)
+        self.import_file = Path(import_file)
+        super().__init__()
+    
+    def _create_engine(self):
+        """Create the SQLite engine with WAL journaling on every connection."""
+        engine = create_engine(f"sqlite:///{self.db_file}")
+        
+        @event.listens_for(engine, "connect")
+        def _set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+        
+        return engine
+    
+    def _prepare_storage(self, metadata: MetaData) -> None:
+        """
+        Create the table and seed an empty store, once across all workers.
+        
+        Workers start together, so table creation, the empty check and the
+        seeding run in one BEGIN IMMEDIATE transaction: the first worker
+        takes the write lock and seeds, the others wait for its commit and
+        then find the keys.
+        """
+        imported = created = None
+        with self._engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            metadata.create_all(conn)
+            if conn.execute(select(func.count()).select_from(self._api_keys_table)).scalar() == 0:
+                imported = self._read_json_keys()
+                if imported:
+                    self._insert_keys(conn, imported)
+                else:
+                    created = self._insert_new_keys(conn, list(DEFAULT_KEY_NAMES))
+            conn.commit()
+        
+        if imported:
+            logger.info(f"Imported {len(imported)} API keys from {self.import_file}")
+        elif created:
+            self._log_default_keys(created)
+    
+    def _read_json_keys(self) -> List[APIKey]:
+        """Read the keys of an existing api_keys.json for the first-run import."""
+        if not self.import_file.exists():
+            return []
+        try:
+            raw = self.import_file.read_bytes()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            return [APIKey.from_storage_dict(key_data) for key_data in data.get("keys", [])]
+        except Exception as e:
+            logger.warning(f"Failed to import API keys from {self.import_file}: {e}")
+            return []
+    
+    def _write_usage(self, conn, pending: Dict[str, tuple]) -> None:
+        """Apply buffered usage stats with one executemany UPDATE."""
+        # SQLite cannot alias VALUES columns, so the join form is not available
+        table = self._api_keys_table
+        stmt = update(table).where(table.c.key == bindparam("usage_key")).values(
+            request_count=table.c.request_count + bindparam("usage_delta"),
+            last_used_at=bindparam("usage_ts"),
+        )
+        conn.execute(
+            stmt,
+            [
+                {"usage_key": key, "usage_delta": count, "usage_ts": ts}
+                for key, (count, ts) in pending.items()
+            ],
+        )
 
 
+@functools.cache
 def get_api_key_manager() -> APIKeyManagerProtocol:
     """Get or create the global API key manager.
     
     Uses PostgreSQL if DATABASE_URL is set and connection succeeds,
-    otherwise falls back to local JSON storage.
+    otherwise SQLite if API_KEYS_SQLITE_FILE is set, otherwise local JSON
+    storage. The instance is memoized, so per-request calls are a single
+    cache lookup.
     """
-    global _api_key_manager
-    if _api_key_manager is None:
-        database_url = os.getenv("DATABASE_URL", "")
-        if database_url:
-            try:
-                logger.info("Using PostgreSQL for API key storage")
-                _api_key_manager = PostgresAPIKeyManager()
-            except Exception as e:
-                logger.warning(f"Failed to connect to PostgreSQL for API keys: {e}")
-                logger.info("Falling back to local JSON file for API key storage")
-                _api_key_manager = LocalAPIKeyManager()
-        else:
-            logger.info("Using local JSON file for API key storage")
-            _api_key_manager = LocalAPIKeyManager()
-    return _api_key_manager
+    database_url = os.getenv("DATABASE_URL", "")
+    if database_url:
+        try:
+            logger.info("Using PostgreSQL for API key storage")
+            return PostgresAPIKeyManager()
+        except Exception as e:
+            logger.warning(f"Failed to connect to PostgreSQL for API keys: {e}")
+    if API_KEYS_SQLITE_FILE:
+        logger.info("Using SQLite for API key storage")
+        return SQLiteAPIKeyManager()
+    logger.info("Using local JSON file for API key storage")
+    return LocalAPIKeyManager()
+
+
+def _dispose_inherited_pool() -> None:
+    """Drop pooled DB connections inherited from the parent after fork.
+    
+    Pre-forking servers (gunicorn --preload) create the manager in the parent;
+    sharing its sockets between workers corrupts the connection state.
+    """
+    # Only inspect a manager that already exists; never create one in the child
+    if get_api_key_manager.cache_info().currsize == 0:
+        return
+    manager = get_api_key_manager()
+    if isinstance(manager, _SQLAPIKeyManager) and manager._engine is not None:
+        manager._engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_inherited_pool)
 
 
 def validate_api_key(key: str) -> bool:
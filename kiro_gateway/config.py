@@ -24,12 +24,22 @@ Centralized storage for all settings, constants, and mappings.
 Loads configuration from YAML file and provides typed access to them.
 """
 
+import copy
+import functools
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
 
 import yaml
+from pydantic import BaseModel, field_validator, model_validator
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlSafeLoader
 
 
 def _load_yaml_config(config_file: str = "config.yml") -> Dict[str, Any]:
@@ -40,62 +50,149 @@ def _load_yaml_config(config_file: str = "config.yml") -> Dict[str, Any]:
         config_file: Path to YAML config file (default "config.yml")
     
     Returns:
-        Dictionary with configuration values
+        Dictionary with configuration values, or empty dict if the file
+        is missing or can't be read or parsed
     """
-    config_path = Path(config_file)
-    if not config_path.exists():
-        return {}
-    
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f) or {}
-        return config
+        return read_config_file(config_file) or {}
     except Exception:
         return {}
 
 
-def _get_config_value(config: Dict[str, Any], key: str, default: Any = None) -> Any:
+def read_config_file(config_file: str = "config.yml") -> Optional[Dict[str, Any]]:
     """
-    Get configuration value from config dict.
+    Read a YAML config file, reusing the parsed result while the file is unchanged.
     
     Args:
-        config: Configuration dictionary
-        key: Configuration key
-        default: Default value if key not found
+        config_file: Path to YAML config file (default "config.yml")
     
     Returns:
-        Configuration value or default
+        A fresh copy of the parsed mapping, or None if the file does not exist
+    
+    Raises:
+        OSError, yaml.YAMLError: If the file can't be read or parsed
+    """
+    config_path = Path(config_file)
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
+        return None
+    
+    # Parsed results are memoized per file version; deep-copy so callers can't
+    # mutate the cache, including nested sections such as oauth
+    return copy.deepcopy(_parse_yaml_file(str(config_path), stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_yaml_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
     """
-    return config.get(key, default)
+    Parse a YAML file; mtime_ns and size key the cache so edits are re-read.
+    
+    Errors propagate and are not cached.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlSafeLoader) or {}
+
+
+class _SettingsModel(BaseModel):
+    """Base for config.yml sections: keys set to null fall back to their defaults."""
+    
+    model_config = {"coerce_numbers_to_str": True}
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_null_values(cls, data: Any) -> Any:
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value is not None}
+        return data
+
+
+class _OAuthSettings(_SettingsModel):
+    """OAuth section of config.yml."""
+    
+    callback_port_start: int = 19876
+    callback_port_end: int = 19880
+    auth_timeout: int = 600
+    poll_interval: int = 5
+
+
+class _GatewaySettings(_SettingsModel):
+    """
+    Typed view of config.yml.
+    
+    All values are validated and coerced in one model_validate() call instead
+    of per-field int()/str() conversions.
+    """
+    
+    secret_key: str = "admin123"
+    refresh_token: str = ""
+    profile_arn: str = ""
+    kiro_region: str = "us-east-1"
+    kiro_creds_file: str = ""
+    kiro_cli_db_file: str = ""
+    tool_description_max_length: int = 10000
+    log_level: str = "INFO"
+    first_token_timeout: float = 15
+    streaming_read_timeout: float = 300
+    first_token_max_retries: int = 3
+    debug_mode: str = "off"
+    debug_dir: str = "debug_logs"
+    debug_pretty_json: bool = False
+    oauth: _OAuthSettings = _OAuthSettings()
+    
+    @field_validator(
+        "secret_key", "refresh_token", "profile_arn", "kiro_region", "kiro_creds_file",
+        "kiro_cli_db_file", "log_level", "debug_mode", "debug_dir",
+        mode="before",
+    )
+    @classmethod
+    def _scalar_to_str(cls, value: Any) -> Any:
+        # YAML 1.1 reads unquoted off/no/yes as booleans (and dates as date objects);
+        # these fields were always str(...)-converted, so an unquoted value still loads
+        if isinstance(value, (str, dict, list)):
+            return value
+        return str(value)
+    
+    @field_validator("log_level", mode="after")
+    @classmethod
+    def _upper_log_level(cls, value: str) -> str:
+        return value.upper()
+    
+    @field_validator("debug_mode", mode="after")
+    @classmethod
+    def _known_debug_mode(cls, value: str) -> str:
+        value = value.lower()
+        return value if value in ("off", "errors", "all") else "off"
 
 
 # Load configuration from YAML
 _config = _load_yaml_config()
+_settings = _GatewaySettings.model_validate(_config)
 
 # ==================================================================================================
 # Web UI Settings
 # ==================================================================================================
 
 # Secret key for Web UI login
-SECRET_KEY: str = _get_config_value(_config, "secret_key", "admin123")
+SECRET_KEY: str = _settings.secret_key
 
 # ==================================================================================================
 # Kiro API Credentials
 # ==================================================================================================
 
-REFRESH_TOKEN: str = _get_config_value(_config, "refresh_token", "")
+REFRESH_TOKEN: str = _settings.refresh_token
 
-PROFILE_ARN: str = _get_config_value(_config, "profile_arn", "")
+PROFILE_ARN: str = _settings.profile_arn
 
-REGION: str = _get_config_value(_config, "kiro_region", "us-east-1")
+REGION: str = _settings.kiro_region
 
-_raw_creds_file = _get_config_value(_config, "kiro_creds_file", "")
+_raw_creds_file = _settings.kiro_creds_file
 KIRO_CREDS_FILE: str = str(Path(_raw_creds_file)) if _raw_creds_file else ""
 
 # Path to kiro-cli SQLite database (optional, for AWS SSO OIDC authentication)
 # Default location: ~/.local/share/kiro-cli/data.sqlite3 (Linux/macOS)
 # or ~/.local/share/amazon-q/data.sqlite3 (amazon-q-developer-cli)
-_raw_cli_db_file = _get_config_value(_config, "kiro_cli_db_file", "") or os.getenv("KIRO_CLI_DB_FILE", "")
+_raw_cli_db_file = _settings.kiro_cli_db_file or os.getenv("KIRO_CLI_DB_FILE", "")
 KIRO_CLI_DB_FILE: str = str(Path(_raw_cli_db_file)) if _raw_cli_db_file else ""
 
 # ==================================================================================================
@@ -131,7 +228,7 @@ BASE_RETRY_DELAY: float = 1.0
 # Model Mapping
 # ==================================================================================================
 
-MODEL_MAPPING: Dict[str, str] = {
+_MODEL_MAPPING_RAW: Dict[str, str] = {
     "claude-opus-4-5": "claude-opus-4.5",
     "claude-opus-4-5-20251101": "claude-opus-4.5",
     "claude-haiku-4-5": "claude-haiku-4.5",
@@ -144,7 +241,14 @@ MODEL_MAPPING: Dict[str, str] = {
     "auto": "claude-sonnet-4.5",
 }
 
-AVAILABLE_MODELS: List[str] = [
+# Read-only view with interned strings: the mapping never changes after import
+# (get_internal_model_id memoizes on it) and identity hits skip string compares.
+MODEL_MAPPING: Mapping[str, str] = MappingProxyType(
+    {sys.intern(k): sys.intern(v) for k, v in _MODEL_MAPPING_RAW.items()}
+)
+
+# Ordered for the /v1/models listing; membership checks go through is_available_model()
+AVAILABLE_MODELS: Tuple[str, ...] = (
     "claude-opus-4-5",
     "claude-opus-4-5-20251101",
     "claude-haiku-4-5",
@@ -153,7 +257,9 @@ AVAILABLE_MODELS: List[str] = [
     "claude-sonnet-4",
     "claude-sonnet-4-20250514",
     "claude-3-7-sonnet-20250219",
-]
+)
+
+_AVAILABLE_MODELS_SET: FrozenSet[str] = frozenset(AVAILABLE_MODELS)
 
 # ==================================================================================================
 # Model Cache Settings
@@ -167,47 +273,54 @@ DEFAULT_MAX_INPUT_TOKENS: int = 200000
 # Tool Description Handling
 # ==================================================================================================
 
-TOOL_DESCRIPTION_MAX_LENGTH: int = int(_get_config_value(_config, "tool_description_max_length", 10000))
+TOOL_DESCRIPTION_MAX_LENGTH: int = _settings.tool_description_max_length
 
 # ==================================================================================================
 # Logging Settings
 # ==================================================================================================
 
-LOG_LEVEL: str = str(_get_config_value(_config, "log_level", "INFO")).upper()
+LOG_LEVEL: str = _settings.log_level
 
 # ==================================================================================================
 # First Token Timeout Settings
 # ==================================================================================================
 
-FIRST_TOKEN_TIMEOUT: float = float(_get_config_value(_config, "first_token_timeout", 15))
+FIRST_TOKEN_TIMEOUT: float = _settings.first_token_timeout
 
-STREAMING_READ_TIMEOUT: float = float(_get_config_value(_config, "streaming_read_timeout", 300))
+STREAMING_READ_TIMEOUT: float = _settings.streaming_read_timeout
 
-FIRST_TOKEN_MAX_RETRIES: int = int(_get_config_value(_config, "first_token_max_retries", 3))
+FIRST_TOKEN_MAX_RETRIES: int = _settings.first_token_max_retries
 
 # ==================================================================================================
 # Debug Settings
 # ==================================================================================================
 
-_DEBUG_MODE_RAW: str = str(_get_config_value(_config, "debug_mode", "off")).lower()
+# Unknown values fall back to "off"
+DEBUG_MODE: str = _settings.debug_mode
 
-if _DEBUG_MODE_RAW in ("off", "errors", "all"):
-    DEBUG_MODE: str = _DEBUG_MODE_RAW
-else:
-    DEBUG_MODE: str = "off"
+DEBUG_DIR: str = _settings.debug_dir
 
-DEBUG_DIR: str = _get_config_value(_config, "debug_dir", "debug_logs")
+# Pretty-print JSON request bodies in debug logs (default: write raw bytes as received)
+DEBUG_PRETTY_JSON: bool = _settings.debug_pretty_json
 
 # ==================================================================================================
 # OAuth Settings
 # ==================================================================================================
 
-_oauth_config = _get_config_value(_config, "oauth", {}) or {}
+OAUTH_CALLBACK_PORT_START: int = _settings.oauth.callback_port_start
+OAUTH_CALLBACK_PORT_END: int = _settings.oauth.callback_port_end
+OAUTH_AUTH_TIMEOUT: int = _settings.oauth.auth_timeout
+OAUTH_POLL_INTERVAL: int = _settings.oauth.poll_interval
 
-OAUTH_CALLBACK_PORT_START: int = int(_oauth_config.get("callback_port_start", 19876))
-OAUTH_CALLBACK_PORT_END: int = int(_oauth_config.get("callback_port_end", 19880))
-OAUTH_AUTH_TIMEOUT: int = int(_oauth_config.get("auth_timeout", 600))
-OAUTH_POLL_INTERVAL: int = int(_oauth_config.get("poll_interval", 5))
+
+# Built once; only the two timeout values are filled in when the warning fires
+_TIMEOUT_WARNING_TEMPLATE: str = """
+\033[93mWARNING: Suboptimal timeout configuration detected.
+    
+    FIRST_TOKEN_TIMEOUT ({first_token}s) >= STREAMING_READ_TIMEOUT ({streaming}s)
+    
+    Recommendation: FIRST_TOKEN_TIMEOUT should be LESS than STREAMING_READ_TIMEOUT.\033[0m
+"""
 
 
 def _warn_timeout_configuration():
@@ -215,16 +328,10 @@ def _warn_timeout_configuration():
     Print warning if timeout configuration is suboptimal.
     """
     if FIRST_TOKEN_TIMEOUT >= STREAMING_READ_TIMEOUT:
-        YELLOW = "\033[93m"
-        RESET = "\033[0m"
-        
-        warning_text = f"""
-{YELLOW}WARNING: Suboptimal timeout configuration detected.
-    
-    FIRST_TOKEN_TIMEOUT ({FIRST_TOKEN_TIMEOUT}s) >= STREAMING_READ_TIMEOUT ({STREAMING_READ_TIMEOUT}s)
-    
-    Recommendation: FIRST_TOKEN_TIMEOUT should be LESS than STREAMING_READ_TIMEOUT.{RESET}
-"""
+        warning_text = _TIMEOUT_WARNING_TEMPLATE.format(
+            first_token=FIRST_TOKEN_TIMEOUT,
+            streaming=STREAMING_READ_TIMEOUT,
+        )
         print(warning_text, file=sys.stderr)
 
 # ==================================================================================================
@@ -285,26 +392,39 @@ APP_TITLE: str = "Kiro API Gateway"
 APP_DESCRIPTION: str = "OpenAI-compatible interface for Kiro API (AWS CodeWhisperer). Made by @jwadow"
 
 
+# ==================================================================================================
+# URL and Model Helpers
+# ==================================================================================================
+
+# Pure functions of a handful of regions/model names, called on every request,
+# so their results are memoized.
+
+
+@functools.lru_cache(maxsize=64)
 def get_kiro_refresh_url(region: str) -> str:
     """Return Kiro Desktop Auth token refresh URL for the specified region."""
     return KIRO_REFRESH_URL_TEMPLATE.format(region=region)
 
 
+@functools.lru_cache(maxsize=64)
 def get_aws_sso_oidc_url(region: str) -> str:
     """Return AWS SSO OIDC token URL for the specified region."""
     return AWS_SSO_OIDC_URL_TEMPLATE.format(region=region)
 
 
+@functools.lru_cache(maxsize=64)
 def get_kiro_api_host(region: str) -> str:
     """Return API host for the specified region."""
     return KIRO_API_HOST_TEMPLATE.format(region=region)
 
 
+@functools.lru_cache(maxsize=64)
 def get_kiro_q_host(region: str) -> str:
     """Return Q API host for the specified region."""
     return KIRO_Q_HOST_TEMPLATE.format(region=region)
 
 
+@functools.lru_cache(maxsize=64)
 def get_internal_model_id(external_model: str) -> str:
     """
     Convert external model name to internal Kiro ID.
@@ -316,3 +436,8 @@ def get_internal_model_id(external_model: str) -> str:
         Internal model ID for Kiro API
     """
     return MODEL_MAPPING.get(external_model, external_model)
+
+
+def is_available_model(model: str) -> bool:
+    """Check whether a model is in AVAILABLE_MODELS (O(1) set lookup)."""
+    return model in _AVAILABLE_MODELS_SET
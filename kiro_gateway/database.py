@@ -7,14 +7,18 @@ Provides SQLAlchemy async engine, session factory, and ORM models
 for storing Kiro accounts in PostgreSQL.
 """
 
+import asyncio
 import os
+import time
+import weakref
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, JSON
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, deferred
 from loguru import logger
 
 # Load environment variables
@@ -22,6 +26,13 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
+# Connection pool sizing (per worker process). Every worker opens up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so the defaults stay well under
+# PostgreSQL's default max_connections=100 with several workers; raise them
+# when the server allows more connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
 
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy ORM models."""
@@ -71,9 +82,10 @@ class KiroAccount(Base):
     auth_method = Column(String(50))  # "social", "builder-id", "IdC"
     provider = Column(String(50))  # "Google", "Github", "AWS"
     
-    # Credentials
-    access_token = Column(Text)
-    refresh_token = Column(Text)
+    # Credentials (deferred: loaded only by queries that undefer the
+    # "credentials" group, so listings never pull the token blobs)
+    access_token = deferred(Column(Text), group="credentials")
+    refresh_token = deferred(Column(Text), group="credentials")
     profile_arn = Column(String(500))
     region = Column(String(50), default="us-east-1")
     
@@ -90,7 +102,9 @@ class KiroAccount(Base):
     request_count = Column(Integer, default=0)
     
     # Extra data (for IdC client_id, client_secret, etc.)
-    extra_data = Column(JSON, default=dict)
+    # Stored as JSONB on PostgreSQL (binary, decoded without re-parsing text);
+    # older databases are converted by _migrate_extra_data_to_jsonb()
+    extra_data = Column(JSON().with_variant(JSONB(), "postgresql"), default=dict)
     
     def to_dict(self) -> dict:
         """Convert account to dictionary (without sensitive data)."""
@@ -107,18 +121,40 @@ class KiroAccount(Base):
             "request_count": self.request_count,
         }
     
-    def is_token_valid(self) -> bool:
-        """Check if the token is still valid."""
-        if not self.expires_at:
+    @property
+    def expires_at_ts(self) -> Optional[float]:
+        """Token expiration as a Unix timestamp (cached until expires_at changes)."""
+        expires_at = self.expires_at
+        cached = self.__dict__.get("_expires_at_ts_cache")
+        if cached is None or cached[0] is not expires_at:
+            cached = (expires_at, expires_at.timestamp() if expires_at else None)
+            self.__dict__["_expires_at_ts_cache"] = cached
+        return cached[1]
+    
+    def is_token_valid(self, now_ts: Optional[float] = None) -> bool:
+        """
+        Check if the token is still valid.
+        
+        Args:
+            now_ts: Current Unix time; pass one value when checking many accounts
+        """
+        expires_at_ts = self.expires_at_ts
+        if expires_at_ts is None:
             return False
-        return datetime.now(timezone.utc) < self.expires_at
+        return (time.time() if now_ts is None else now_ts) < expires_at_ts
     
-    def is_token_expiring_soon(self, threshold_seconds: int = 600) -> bool:
-        """Check if the token is expiring within threshold."""
-        if not self.expires_at:
+    def is_token_expiring_soon(self, threshold_seconds: int = 600, now_ts: Optional[float] = None) -> bool:
+        """
+        Check if the token is expiring within threshold.
+        
+        Args:
+            threshold_seconds: How close to expiration counts as "soon"
+            now_ts: Current Unix time; pass one value when checking many accounts
+        """
+        expires_at_ts = self.expires_at_ts
+        if expires_at_ts is None:
             return True
-        now = datetime.now(timezone.utc)
-        return (self.expires_at.timestamp() - now.timestamp()) <= threshold_seconds
+        return expires_at_ts - (time.time() if now_ts is None else now_ts) <= threshold_seconds
     
     @property
     def client_id(self) -> str | None:
@@ -137,9 +173,10 @@ class KiroAccount(Base):
         return self.extra_data.get("clientSecret") or self.extra_data.get("client_secret")
 
 
-# Global engine and session factory (initialized in init_database)
-_engine = None
-_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+# Engine and session factory per event loop, created on first use.
+# asyncpg connections are bound to the loop that opened them, so a loop
+# never reuses another loop's pool; entries go away with their loop.
+_engines: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # loop -> (engine, session factory)
 
 
 def is_database_configured() -> bool:
@@ -147,6 +184,81 @@ def is_database_configured() -> bool:
     return bool(DATABASE_URL)
 
 
+def _async_database_url(url: str) -> str:
+    """
+    Point plain PostgreSQL URLs at the asyncpg driver.
+    
+    Hosting platforms hand out postgres:// or postgresql:// URLs, which
+    SQLAlchemy would resolve to a sync driver that the async engine cannot use.
+    """
+    for scheme in ("postgresql://", "postgres://"):
+        if url.startswith(scheme):
+            return "postgresql+asyncpg://" + url[len(scheme):]
+    return url
+
+
+def _create_engine() -> AsyncEngine:
+    """Create the async engine for DATABASE_URL."""
+    database_url = _async_database_url(DATABASE_URL)
+    connect_args = {}
+    if database_url.startswith("postgresql+asyncpg://"):
+        connect_args = {
+            "timeout": 10,
+            # Short queries gain nothing from JIT; keepalives detect dropped peers
+            "server_settings": {"jit": "off", "tcp_keepalives_idle": "60"},
+            # Per-connection cache of server-side prepared statements (default 100);
+            # SQL compilation itself is already cached by the engine
+            "prepared_statement_cache_size": 256,
+        }
+    
+    return create_async_engine(
+        database_url,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        # Dead connections (failover, NAT/LB idle timeouts) are replaced before use
+        pool_pre_ping=True,
+        # Connections are long-lived; recycle well before typical server idle limits
+        pool_recycle=1800,
+        connect_args=connect_args,
+    )
+
+
+def _engine_for_loop() -> Tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
+    """Return the engine and session factory of the running event loop, creating them once."""
+    loop = asyncio.get_running_loop()
+    entry = _engines.get(loop)
+    if entry is None:
+        engine = _create_engine()
+        session_factory = async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        entry = _engines[loop] = (engine, session_factory)
+    return entry
+
+
+async def _migrate_extra_data_to_jsonb(conn) -> None:
+    """
+    Convert kiro_accounts.extra_data from json to jsonb on existing databases.
+    
+    create_all() only creates missing tables, so databases created before the
+    column became JSONB keep a json column until it is altered once.
+    """
+    data_type = await conn.scalar(text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() "
+        "AND table_name = 'kiro_accounts' AND column_name = 'extra_data'"
+    ))
+    if data_type == "json":
+        logger.info("Migrating kiro_accounts.extra_data from json to jsonb...")
+        await conn.execute(text(
+            "ALTER TABLE kiro_accounts "
+            "ALTER COLUMN extra_data TYPE jsonb USING extra_data::jsonb"
+        ))
+
+
 async def init_database() -> async_sessionmaker[AsyncSession]:
     """
     Initialize database connection and create tables.
@@ -157,42 +269,41 @@ async def init_database() -> async_sessionmaker[AsyncSession]:
     Raises:
         ValueError: If DATABASE_URL is not set
     """
-    global _engine, _session_factory
-    
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable is not set")
     
     logger.info("Initializing database connection...")
     
-    _engine = create_async_engine(
-        DATABASE_URL,
-        echo=False,
-        pool_size=5,
-        max_overflow=10,
-    )
+    engine, session_factory = _engine_for_loop()
     
     # Create tables
-    async with _engine.begin() as conn:
+    async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
-    _session_factory = async_sessionmaker(
-        _engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
+        if conn.dialect.name == "postgresql":
+            await _migrate_extra_data_to_jsonb(conn)
     
     logger.info("Database initialized successfully")
-    return _session_factory
+    return session_factory
 
 
 async def close_database() -> None:
-    """Close database connection."""
-    global _engine
-    if _engine:
-        await _engine.dispose()
+    """Close the running event loop's database connections."""
+    entry = _engines.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[0].dispose()
         logger.info("Database connection closed")
 
 
 def get_session_factory() -> Optional[async_sessionmaker[AsyncSession]]:
-    """Get the session factory (must call init_database first)."""
-    return _session_factory
+    """
+    Get the session factory for the running event loop.
+    
+    The engine is created on first use; tables are only created by
+    init_database(). Must be called from within a running event loop.
+    
+    Returns:
+        Session factory, or None if DATABASE_URL is not set
+    """
+    if not DATABASE_URL:
+        return None
+    return _engine_for_loop()[1]
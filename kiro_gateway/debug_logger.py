@@ -31,38 +31,52 @@
 их в файл app_logs.txt для удобства отладки.
 """
 
+import functools
 import io
 import json
-import shutil
+import queue
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from loguru import logger
 
-from kiro_gateway.config import DEBUG_MODE, DEBUG_DIR
+# orjson опционален: намного быстрее разбирает и форматирует большие тела запросов
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from kiro_gateway.config import DEBUG_MODE, DEBUG_DIR, DEBUG_PRETTY_JSON
+
+
+# Размер буфера файлов стрима: чанки копятся в памяти и пишутся блоками по 64 КБ
+_STREAM_BUFFER_SIZE = 64 * 1024
+
+# Все файлы, которые логгер пишет в debug_dir
+_DEBUG_FILE_NAMES = (
+    "request_body.json",
+    "kiro_request_body.json",
+    "response_stream_raw.txt",
+    "response_stream_modified.txt",
+    "error_info.json",
+    "app_logs.txt",
+)
 
 
 class DebugLogger:
     """
-    Синглтон для управления отладочными логами запросов.
+    Управление отладочными логами запросов.
+    
+    Используется единственный экземпляр - debug_logger в конце модуля.
     
     Режимы работы:
     - off: ничего не делает
     - errors: буферизует данные, сбрасывает в файлы только при ошибках
     - all: пишет данные сразу в файлы (как раньше)
     """
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DebugLogger, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
 
     def __init__(self):
-        if self._initialized:
-            return
         self.debug_dir = Path(DEBUG_DIR)
-        self._initialized = True
         
         # Буферы для режима "errors"
         self._request_body_buffer: Optional[bytes] = None
@@ -73,6 +87,11 @@ class DebugLogger:
         # Буфер для логов приложения (loguru)
         self._app_logs_buffer: io.StringIO = io.StringIO()
         self._loguru_sink_id: Optional[int] = None
+        
+        # Очередь для фонового потока записи (режим "all"): чанки стрима и
+        # остальные файловые операции, чтобы файловый I/O не блокировал event loop
+        self._write_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
     
     def _is_enabled(self) -> bool:
         """Проверяет, включено ли логирование."""
@@ -143,27 +162,22 @@ class DebugLogger:
         self._setup_app_logs_capture()
 
         if self._is_immediate_write():
-            # Режим "all" - очищаем папку и создаём заново
-            try:
-                if self.debug_dir.exists():
-                    shutil.rmtree(self.debug_dir)
-                self.debug_dir.mkdir(parents=True, exist_ok=True)
-                logger.debug(f"[DebugLogger] Directory {self.debug_dir} cleared for new request.")
-            except Exception as e:
-                logger.error(f"[DebugLogger] Error preparing directory: {e}")
+            # Режим "all" - очищаем папку в потоке записи: после закрытия файлов
+            # стрима предыдущего запроса и до записи файлов нового
+            self._enqueue_task(self._prepare_debug_dir)
 
     def log_request_body(self, body: bytes):
         """
         Сохраняет тело запроса (от клиента, OpenAI формат).
         
-        В режиме "all": пишет сразу в файл.
+        В режиме "all": ставит запись в файл в очередь потока записи.
         В режиме "errors": буферизует.
         """
         if not self._is_enabled():
             return
 
         if self._is_immediate_write():
-            self._write_request_body_to_file(body)
+            self._enqueue_task(self._write_request_body_to_file, body)
         else:
             # Режим "errors" - буферизуем
             self._request_body_buffer = body
@@ -172,14 +186,14 @@ class DebugLogger:
         """
         Сохраняет модифицированное тело запроса (к Kiro API).
         
-        В режиме "all": пишет сразу в файл.
+        В режиме "all": ставит запись в файл в очередь потока записи.
         В режиме "errors": буферизует.
         """
         if not self._is_enabled():
             return
 
         if self._is_immediate_write():
-            self._write_kiro_request_body_to_file(body)
+            self._enqueue_task(self._write_kiro_request_body_to_file, body)
         else:
             # Режим "errors" - буферизуем
             self._kiro_request_body_buffer = body
@@ -188,7 +202,7 @@ class DebugLogger:
         """
         Дописывает сырой чанк ответа (от провайдера).
         
-        В режиме "all": пишет сразу в файл.
+        В режиме "all": ставит запись в файл в очередь потока записи.
         В режиме "errors": буферизует.
         """
         if not self._is_enabled():
@@ -204,7 +218,7 @@ class DebugLogger:
         """
         Дописывает модифицированный чанк (клиенту).
         
-        В режиме "all": пишет сразу в файл.
+        В режиме "all": ставит запись в файл в очередь потока записи.
         В режиме "errors": буферизует.
         """
         if not self._is_enabled():
@@ -231,6 +245,10 @@ class DebugLogger:
         if not self._is_enabled():
             return
         
+        self._write_error_info_to_file(status_code, error_message)
+    
+    def _write_error_info_to_file(self, status_code: int, error_message: str):
+        """Записывает error_info.json."""
         try:
             # Убеждаемся что директория существует
             self.debug_dir.mkdir(parents=True, exist_ok=True)
@@ -263,9 +281,8 @@ class DebugLogger:
         
         # В режиме "all" данные уже записаны, добавляем error_info и логи приложения
         if self._is_immediate_write():
-            self.log_error_info(status_code, error_message)
-            self._write_app_logs_to_file()
-            self._clear_app_logs_buffer()
+            self._enqueue_task(self._write_error_info_to_file, status_code, error_message)
+            self._enqueue_app_logs()
             return
         
         # Проверяем, есть ли что сбрасывать
@@ -278,10 +295,8 @@ class DebugLogger:
             return
         
         try:
-            # Создаём директорию если не существует
-            if self.debug_dir.exists():
-                shutil.rmtree(self.debug_dir)
-            self.debug_dir.mkdir(parents=True, exist_ok=True)
+            # Создаём директорию если не существует и убираем логи прошлого запроса
+            self._clear_debug_dir()
             
             # Сбрасываем буферы в файлы
             if self._request_body_buffer:
@@ -325,63 +340,167 @@ class DebugLogger:
             self._clear_buffers()
         elif DEBUG_MODE == "all":
             # В режиме "all" сохраняем логи даже для успешных запросов
-            self._write_app_logs_to_file()
-            self._clear_app_logs_buffer()
+            self._enqueue_app_logs()
+    
+    def close_streams(self, wait: bool = False):
+        """
+        Ставит в очередь закрытие файлов стрима.
+        
+        По умолчанию не ждёт записи, чтобы не блокировать event loop: очередь
+        упорядочена, и следующие операции с файлами выполнятся после закрытия.
+        discard_buffers/flush_on_error закрывают файлы тем же барьером, что
+        и запись логов приложения.
+        
+        Args:
+            wait: Дождаться записи всего, что уже стоит в очереди
+                (для тестов и завершения работы, не из event loop)
+        """
+        if self._writer is None or not self._writer.is_alive():
+            return
+        if not wait:
+            self._enqueue_task(None)
+            return
+        done = threading.Event()
+        self._enqueue_task(done.set)
+        done.wait()
     
     # ==================== Приватные методы записи в файлы ====================
     
     def _write_request_body_to_file(self, body: bytes):
         """Записывает тело запроса в файл."""
         try:
-            file_path = self.debug_dir / "request_body.json"
-            try:
-                json_obj = json.loads(body)
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(json_obj, f, indent=2, ensure_ascii=False)
-            except json.JSONDecodeError:
-                with open(file_path, "wb") as f:
-                    f.write(body)
+            self._write_json_body(self.debug_dir / "request_body.json", body)
         except Exception as e:
             logger.error(f"[DebugLogger] Error writing request_body: {e}")
     
     def _write_kiro_request_body_to_file(self, body: bytes):
         """Записывает тело запроса к Kiro в файл."""
         try:
-            file_path = self.debug_dir / "kiro_request_body.json"
-            try:
-                json_obj = json.loads(body)
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(json_obj, f, indent=2, ensure_ascii=False)
-            except json.JSONDecodeError:
-                with open(file_path, "wb") as f:
-                    f.write(body)
+            self._write_json_body(self.debug_dir / "kiro_request_body.json", body)
         except Exception as e:
             logger.error(f"[DebugLogger] Error writing kiro_request_body: {e}")
     
-    def _append_raw_chunk_to_file(self, chunk: bytes):
-        """Дописывает сырой чанк в файл."""
+    @staticmethod
+    def _write_json_body(file_path: Path, body: bytes):
+        """
+        Записывает тело запроса в файл.
+        
+        По умолчанию пишет байты как есть, одним write без разбора JSON.
+        При DEBUG_PRETTY_JSON форматирует JSON (с orjson - в нативном коде);
+        если тело не JSON, оно всё равно пишется как есть.
+        """
+        if not DEBUG_PRETTY_JSON:
+            file_path.write_bytes(body)
+            return
+        
         try:
-            file_path = self.debug_dir / "response_stream_raw.txt"
-            with open(file_path, "ab") as f:
-                f.write(chunk)
-        except Exception:
-            pass
+            if orjson is not None:
+                payload = orjson.dumps(orjson.loads(body), option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(json.loads(body), indent=2, ensure_ascii=False).encode("utf-8")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            payload = body
+        file_path.write_bytes(payload)
+    
+    def _append_raw_chunk_to_file(self, chunk: bytes):
+        """Ставит сырой чанк в очередь на дозапись в файл."""
+        self._enqueue_write(self.debug_dir / "response_stream_raw.txt", chunk)
     
     def _append_modified_chunk_to_file(self, chunk: bytes):
-        """Дописывает модифицированный чанк в файл."""
+        """Ставит модифицированный чанк в очередь на дозапись в файл."""
+        self._enqueue_write(self.debug_dir / "response_stream_modified.txt", chunk)
+    
+    def _prepare_debug_dir(self):
+        """Очищает директорию для нового запроса (выполняется в потоке записи)."""
         try:
-            file_path = self.debug_dir / "response_stream_modified.txt"
-            with open(file_path, "ab") as f:
-                f.write(chunk)
-        except Exception:
-            pass
+            self._clear_debug_dir()
+            logger.debug(f"[DebugLogger] Directory {self.debug_dir} cleared for new request.")
+        except Exception as e:
+            logger.error(f"[DebugLogger] Error preparing directory: {e}")
+    
+    def _clear_debug_dir(self):
+        """
+        Удаляет файлы прошлого запроса и гарантирует существование директории.
+        
+        Удаляются только известные файлы логгера - без обхода дерева
+        и пересоздания директории, как было с rmtree + mkdir.
+        """
+        self.debug_dir.mkdir(parents=True, exist_ok=True)
+        for name in _DEBUG_FILE_NAMES:
+            try:
+                (self.debug_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _ensure_writer(self):
+        """Запускает фоновый поток записи, если он ещё не запущен."""
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="debug-logger-writer", daemon=True
+            )
+            self._writer.start()
+    
+    def _enqueue_write(self, file_path: Path, chunk: bytes):
+        """Передаёт чанк фоновому потоку записи."""
+        self._ensure_writer()
+        self._write_queue.put((file_path, chunk))
+    
+    def _enqueue_task(self, func: Optional[Callable], *args):
+        """
+        Передаёт потоку записи барьер: закрыть файлы стрима и выполнить func.
+        
+        Задачи выполняются строго по порядку с чанками, поэтому очистка
+        директории не обгоняет запись чанков прошлого запроса.
+        """
+        self._ensure_writer()
+        task = functools.partial(func, *args) if func is not None and args else func
+        self._write_queue.put((None, task))
+    
+    def _writer_loop(self):
+        """
+        Фоновый поток записи чанков стрима.
+        
+        Держит файлы открытыми между чанками вместо open/close на каждый чанк;
+        буферизованные данные сбрасываются на диск при close_streams().
+        Элемент (None, task) - барьер: закрыть файлы и выполнить task, если он задан.
+        """
+        files = {}
+        while True:
+            file_path, payload = self._write_queue.get()
+            if file_path is None:
+                for f in files.values():
+                    try:
+                        f.close()
+                    except Exception:
+                        pass
+                files.clear()
+                if payload is not None:
+                    try:
+                        payload()
+                    except Exception:
+                        pass
+                continue
+            try:
+                f = files.get(file_path)
+                if f is None:
+                    f = files[file_path] = open(file_path, "ab", buffering=_STREAM_BUFFER_SIZE)
+                f.write(payload)
+            except Exception:
+                pass
+    
+    def _enqueue_app_logs(self):
+        """Передаёт захваченные логи приложения потоку записи и очищает буфер."""
+        logs_content = self._app_logs_buffer.getvalue()
+        self._clear_app_logs_buffer()
+        self._enqueue_task(self._write_app_logs_content, logs_content)
     
     def _write_app_logs_to_file(self):
         """Записывает захваченные логи приложения в файл."""
+        self._write_app_logs_content(self._app_logs_buffer.getvalue())
+    
+    def _write_app_logs_content(self, logs_content: str):
+        """Записывает логи приложения в app_logs.txt."""
         try:
-            # Получаем содержимое буфера
-            logs_content = self._app_logs_buffer.getvalue()
-            
             if not logs_content.strip():
                 return
             
@@ -398,5 +517,33 @@ class DebugLogger:
             pass
 
 
+def _noop(*args, **kwargs):
+    """Заглушка для методов логгера при DEBUG_MODE=off."""
+    return None
+
+
+class _DisabledDebugLogger(DebugLogger):
+    """
+    Логгер для DEBUG_MODE=off.
+    
+    DEBUG_MODE фиксируется при импорте, поэтому методы логирования заменены
+    на заглушки: вызовы на каждом чанке стрима не проверяют режим.
+    """
+
+
+for _method_name in (
+    "prepare_new_request",
+    "log_request_body",
+    "log_kiro_request_body",
+    "log_raw_chunk",
+    "log_modified_chunk",
+    "log_error_info",
+    "flush_on_error",
+    "discard_buffers",
+    "close_streams",
+):
+    setattr(_DisabledDebugLogger, _method_name, _noop)
+
+
 # Глобальный экземпляр
-debug_logger = DebugLogger()
\ No newline at end of file
+debug_logger = _DisabledDebugLogger() if DEBUG_MODE == "off" else DebugLogger()
@@ -7,19 +7,38 @@ Provides JSON file-based storage as fallback when DATABASE_URL is not set.
 """
 
 import asyncio
+import itertools
 import json
-from datetime import datetime, timezone
+import os
+import time
+from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Tuple, Any
 
+import httpx
 from loguru import logger
 
 from kiro_gateway.auth import KiroAuthManager
-from kiro_gateway.config import TOKEN_REFRESH_THRESHOLD
+from kiro_gateway.config import (
+    TOKEN_REFRESH_THRESHOLD,
+    get_aws_sso_oidc_url,
+    get_kiro_refresh_url,
+)
+
+# orjson is optional: much faster (de)serialization of the accounts file
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 DEFAULT_ACCOUNTS_FILE = "accounts.json"
 
+# Concurrency model: everything runs on one event loop, and account state is
+# only mutated in code without awaits, so readers always see a consistent
+# state without locking. LocalAccountManager._lock serializes mutators, and
+# _write_lock orders file writes; pure reads take neither.
+
 
 class LocalAccount:
     """
@@ -59,10 +78,21 @@ class LocalAccount:
         self.is_active = is_active
         self.request_count = request_count
         self.extra_data = extra_data or {}
+        # Serialized forms, reused until invalidate_cache() is called
+        self._dict_cache: Optional[dict] = None
+        self._storage_dict_cache: Optional[dict] = None
+        self._expires_at_ts_cache: Optional[tuple] = None
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached dict forms. Call after mutating any field."""
+        self._dict_cache = None
+        self._storage_dict_cache = None
     
     def to_dict(self) -> dict:
-        """Convert account to dictionary (without sensitive data)."""
-        return {
+        """Convert account to dictionary (without sensitive data). Do not mutate the result."""
+        if self._dict_cache is not None:
+            return self._dict_cache
+        self._dict_cache = {
             "id": self.id,
             "name": self.name,
             "auth_method": self.auth_method,
@@ -74,10 +104,13 @@ class LocalAccount:
             "is_active": self.is_active,
             "request_count": self.request_count,
         }
+        return self._dict_cache
     
     def to_storage_dict(self) -> dict:
-        """Convert account to dictionary for storage (includes sensitive data)."""
-        return {
+        """Convert account to dictionary for storage (includes sensitive data). Do not mutate the result."""
+        if self._storage_dict_cache is not None:
+            return self._storage_dict_cache
+        self._storage_dict_cache = {
             "id": self.id,
             "name": self.name,
             "auth_method": self.auth_method,
@@ -94,10 +127,38 @@ class LocalAccount:
             "request_count": self.request_count,
             "extra_data": self.extra_data,
         }
+        return self._storage_dict_cache
     
     @classmethod
     def from_storage_dict(cls, data: dict) -> "LocalAccount":
         """Create account from storage dictionary."""
+        return cls(**cls._parse_storage_dict(data))
+    
+    def merge_storage_dict(self, data: dict) -> dict:
+        """
+        Build this account's updated fields from a storage dictionary.
+        
+        Does not modify the account; pass the result to apply_fields().
+        Usage counters only move forward: increments not yet written to the
+        file are kept instead of being reset to the stored values.
+        """
+        fields = self._parse_storage_dict(data)
+        fields["created_at"] = fields["created_at"] or self.created_at
+        fields["extra_data"] = fields["extra_data"] or {}
+        fields["request_count"] = max(fields["request_count"], self.request_count)
+        if self.last_used_at and (not fields["last_used_at"] or fields["last_used_at"] < self.last_used_at):
+            fields["last_used_at"] = self.last_used_at
+        return fields
+    
+    def apply_fields(self, fields: dict) -> None:
+        """Overwrite this account's fields in place (see merge_storage_dict())."""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.invalidate_cache()
+    
+    @staticmethod
+    def _parse_storage_dict(data: dict) -> dict:
+        """Convert a storage dictionary to constructor arguments."""
         def parse_datetime(val):
             if not val:
                 return None
@@ -110,7 +171,7 @@ class LocalAccount:
             except:
                 return None
         
-        return cls(
+        return dict(
             id=data.get("id", 0),
             name=data.get("name", "Unknown"),
             auth_method=data.get("auth_method"),
@@ -128,18 +189,40 @@ class LocalAccount:
             extra_data=data.get("extra_data", {}),
         )
     
-    def is_token_valid(self) -> bool:
-        """Check if the token is still valid."""
-        if not self.expires_at:
+    @property
+    def expires_at_ts(self) -> Optional[float]:
+        """Token expiration as a Unix timestamp (cached until expires_at changes)."""
+        expires_at = self.expires_at
+        cached = self._expires_at_ts_cache
+        if cached is None or cached[0] is not expires_at:
+            cached = (expires_at, expires_at.timestamp() if expires_at else None)
+            self._expires_at_ts_cache = cached
+        return cached[1]
+    
+    def is_token_valid(self, now_ts: Optional[float] = None) -> bool:
+        """
+        Check if the token is still valid.
+        
+        Args:
+            now_ts: Current Unix time; pass one value when checking many accounts
+        """
+        expires_at_ts = self.expires_at_ts
+        if expires_at_ts is None:
             return False
-        return datetime.now(timezone.utc) < self.expires_at
+        return (time.time() if now_ts is None else now_ts) < expires_at_ts
     
-    def is_token_expiring_soon(self, threshold_seconds: int = 600) -> bool:
-        """Check if the token is expiring within threshold."""
-        if not self.expires_at:
+    def is_token_expiring_soon(self, threshold_seconds: int = 600, now_ts: Optional[float] = None) -> bool:
+        """
+        Check if the token is expiring within threshold.
+        
+        Args:
+            threshold_seconds: How close to expiration counts as "soon"
+            now_ts: Current Unix time; pass one value when checking many accounts
+        """
+        expires_at_ts = self.expires_at_ts
+        if expires_at_ts is None:
             return True
-        now = datetime.now(timezone.utc)
-        return (self.expires_at.timestamp() - now.timestamp()) <= threshold_seconds
+        return expires_at_ts - (time.time() if now_ts is None else now_ts) <= threshold_seconds
     
     @property
     def client_id(self) -> Optional[str]:
@@ -164,6 +247,8 @@ class LocalAccountManager:
     """
     
     REFRESH_INTERVAL = 300
+    USAGE_FLUSH_INTERVAL = 10  # Persist buffered usage stats every 10 seconds
+    REFRESH_CONCURRENCY = 8  # Max token refreshes in flight per region
     
     def __init__(self, storage_file: str = DEFAULT_ACCOUNTS_FILE):
         """
@@ -175,59 +260,169 @@ class LocalAccountManager:
         self.storage_file = Path(storage_file)
         self._accounts: Dict[int, LocalAccount] = {}
         self._auth_managers: Dict[int, KiroAuthManager] = {}
-        self._account_ids: List[int] = []
-        self._current_index = 0
+        # Insertion-ordered set of active account ids (dict keys): O(1) add/remove
+        self._account_ids: Dict[int, None] = {}
+        # Immutable round-robin slots of (account_id, auth_manager), read lock-free
+        # by get_next_account; rebuilt under self._lock on membership changes
+        self._slots: Tuple[Tuple[int, KiroAuthManager], ...] = ()
+        self._counter = itertools.count()
         self._next_id = 1
         self._lock = asyncio.Lock()
+        # Serializes file writes so an older snapshot never lands after a newer one
+        self._write_lock = asyncio.Lock()
+        # Save requests issued / covered by a completed write; lets saves queued
+        # behind an in-flight write share the next one instead of each rewriting
+        self._save_requested = 0
+        self._save_completed = 0
         self._refresh_task: Optional[asyncio.Task] = None
+        self._usage_flush_task: Optional[asyncio.Task] = None
+        # Set when usage counters changed in memory but are not on disk yet
+        self._usage_dirty = False
+        # Shared keep-alive client for token refresh, created lazily
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _serialize(self) -> bytes:
+        """Serialize all accounts to the JSON file contents."""
+        data = {
+            "next_id": self._next_id,
+            "accounts": [acc.to_storage_dict() for acc in self._accounts.values()]
+        }
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
     
-    def _save_to_file(self) -> None:
-        """Save accounts to JSON file."""
+    def _write_file(self, payload: bytes) -> None:
+        """
+        Write the accounts file atomically (runs in a worker thread).
+        
+        Writes a temp file, fsyncs it and renames it over the target, so a
+        crash mid-write never leaves a truncated accounts file behind.
+        """
+        tmp_file = self.storage_file.with_suffix(self.storage_file.suffix + '.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.storage_file)
+    
+    async def _save_to_file(self) -> None:
+        """
+        Save accounts to JSON file.
+        
+        The snapshot is serialized on the event loop (no awaits, so it is
+        consistent) and the disk write runs in a thread, so slow disks never
+        block request handling.
+        
+        Bursts of saves (e.g. a refresh sweep updating many accounts) are
+        coalesced: a save that was waiting behind another write returns as
+        soon as a later snapshot, which already contains its change, is on disk.
+        """
+        self._save_requested += 1
+        ticket = self._save_requested
+        async with self._write_lock:
+            if self._save_completed >= ticket:
+                return
+            covered = self._save_requested
+            try:
+                payload = self._serialize()
+                # The snapshot includes the latest usage counters
+                self._usage_dirty = False
+                await asyncio.to_thread(self._write_file, payload)
+                self._save_completed = covered
+                logger.debug(f"Saved {len(self._accounts)} accounts to {self.storage_file}")
+            except Exception as e:
+                self._usage_dirty = True
+                logger.error(f"Failed to save accounts to file: {e}")
+    
+    def _read_file(self) -> Optional[bytes]:
+        """Read the accounts file (runs in a worker thread); None if it does not exist."""
         try:
-            data = {
-                "next_id": self._next_id,
-                "accounts": [acc.to_storage_dict() for acc in self._accounts.values()]
-            }
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved {len(self._accounts)} accounts to {self.storage_file}")
-        except Exception as e:
-            logger.error(f"Failed to save accounts to file: {e}")
+            with open(self.storage_file, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
     
-    def _load_from_file(self) -> None:
-        """Load accounts from JSON file."""
-        if not self.storage_file.exists():
-            logger.info(f"No accounts file found at {self.storage_file}, starting fresh")
-            return
-        
+    def _load_from_file(self, raw: bytes) -> None:
+        """Load accounts from the JSON file contents."""
         try:
-            with open(self.storage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self._next_id = data.get("next_id", 1)
-            accounts_data = data.get("accounts", [])
-            
-            for acc_data in accounts_data:
-                account = LocalAccount.from_storage_dict(acc_data)
-                self._accounts[account.id] = account
-                if account.is_active:
-                    self._account_ids.append(account.id)
-                    auth_manager = self._create_auth_manager(account)
-                    self._auth_managers[account.id] = auth_manager
-                if account.id >= self._next_id:
-                    self._next_id = account.id + 1
-            
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            self._reconcile(data.get("accounts", []), data.get("next_id", 1))
             logger.info(f"Loaded {len(self._accounts)} accounts from {self.storage_file}")
         except Exception as e:
             logger.error(f"Failed to load accounts from file: {e}")
     
+    def _reconcile(self, accounts_data: List[dict], next_id: int) -> None:
+        """
+        Bring in-memory accounts in line with stored account data.
+        
+        Accounts that are already loaded are updated in place and keep their
+        KiroAuthManager; only new accounts are allocated and only accounts
+        missing from the data are dropped. Must be called under self._lock.
+        
+        The new state is built completely before any of it is applied, so
+        malformed data raises with the current accounts left untouched.
+        """
+        accounts: Dict[int, LocalAccount] = {}
+        auth_managers: Dict[int, KiroAuthManager] = {}
+        account_ids: Dict[int, None] = {}
+        # Deferred in-place changes: (loaded account, new fields) and (reused manager, new state)
+        account_updates: List[Tuple[LocalAccount, dict]] = []
+        auth_manager_updates: List[Tuple[KiroAuthManager, LocalAccount]] = []
+        
+        for acc_data in accounts_data:
+            current = self._accounts.get(acc_data.get("id", 0))
+            if current is None:
+                account = LocalAccount.from_storage_dict(acc_data)
+                accounts[account.id] = account
+            else:
+                fields = current.merge_storage_dict(acc_data)
+                account_updates.append((current, fields))
+                accounts[current.id] = current
+                # Staged copy with the new values, used until the update is applied
+                account = LocalAccount(**fields)
+            
+            if account.is_active:
+                account_ids[account.id] = None
+                auth_manager = self._auth_managers.get(account.id)
+                # Region-derived hosts are fixed at construction, so a region change needs a new manager
+                if auth_manager is None or auth_manager._region != (account.region or "us-east-1"):
+                    auth_manager = self._create_auth_manager(account)
+                else:
+                    auth_manager_updates.append((auth_manager, account))
+                auth_managers[account.id] = auth_manager
+            if account.id >= next_id:
+                next_id = account.id + 1
+        
+        for current, fields in account_updates:
+            current.apply_fields(fields)
+        for auth_manager, account in auth_manager_updates:
+            auth_manager._refresh_token = account.refresh_token
+            auth_manager._profile_arn = account.profile_arn
+            if account.access_token:
+                auth_manager._access_token = account.access_token
+            if account.expires_at:
+                auth_manager._expires_at = account.expires_at
+        
+        self._accounts = accounts
+        self._auth_managers = auth_managers
+        self._account_ids = account_ids
+        self._next_id = next_id
+    
     async def load_accounts(self) -> int:
         """Load all active accounts from file."""
+        try:
+            raw = await asyncio.to_thread(self._read_file)
+        except Exception as e:
+            logger.error(f"Failed to read accounts file: {e}")
+            raw = None
+        
         async with self._lock:
-            self._accounts.clear()
-            self._auth_managers.clear()
-            self._account_ids.clear()
-            self._load_from_file()
+            if raw is None:
+                logger.info(f"No accounts file found at {self.storage_file}, starting fresh")
+                self._reconcile([], 1)
+            else:
+                self._load_from_file(raw)
+            self._rebuild_snapshot()
         
         logger.info(f"Loaded {len(self._account_ids)} active accounts from local storage")
         return len(self._account_ids)
@@ -274,12 +469,13 @@ class LocalAccountManager:
             self._next_id += 1
             
             self._accounts[account.id] = account
-            self._account_ids.append(account.id)
+            self._account_ids[account.id] = None
             
             auth_manager = self._create_auth_manager(account)
             self._auth_managers[account.id] = auth_manager
-            
-            self._save_to_file()
+            self._rebuild_snapshot()
+        
+        await self._save_to_file()
         
         logger.info(f"Added account: {name} (id={account.id}, method={auth_method})")
         return account
@@ -293,76 +489,93 @@ class LocalAccountManager:
             del self._accounts[account_id]
             if account_id in self._auth_managers:
                 del self._auth_managers[account_id]
-            if account_id in self._account_ids:
-                self._account_ids.remove(account_id)
-                if self._current_index >= len(self._account_ids):
-                    self._current_index = 0
-            
-            self._save_to_file()
+            self._account_ids.pop(account_id, None)
+            self._rebuild_snapshot()
+        
+        await self._save_to_file()
         
         logger.info(f"Removed account id={account_id}")
         return True
     
+    def _rebuild_snapshot(self) -> None:
+        """Publish a new round-robin snapshot. Must be called under self._lock."""
+        self._slots = tuple(
+            (i, self._auth_managers[i]) for i in self._account_ids if i in self._auth_managers
+        )
+    
     async def get_next_account(self) -> Optional[KiroAuthManager]:
-        """Get next healthy account using round-robin."""
-        async with self._lock:
-            if not self._account_ids:
-                return None
-            
-            attempts = len(self._account_ids)
-            for _ in range(attempts):
-                account_id = self._account_ids[self._current_index]
-                self._current_index = (self._current_index + 1) % len(self._account_ids)
-                
-                auth_manager = self._auth_managers.get(account_id)
-                if auth_manager:
-                    asyncio.create_task(self._update_account_usage(account_id))
-                    return auth_manager
-            
+        """
+        Get next account using round-robin.
+        
+        Lock-free: reads the current immutable snapshot, so concurrent
+        requests never wait on account mutations or file writes.
+        """
+        slots = self._slots
+        if not slots:
             return None
+        
+        account_id, auth_manager = slots[next(self._counter) % len(slots)]
+        self._record_usage(account_id)
+        return auth_manager
     
-    async def _update_account_usage(self, account_id: int) -> None:
-        """Update account usage statistics."""
-        async with self._lock:
-            if account_id in self._accounts:
-                account = self._accounts[account_id]
-                account.last_used_at = datetime.now(timezone.utc)
-                account.request_count += 1
-                self._save_to_file()
+    def _record_usage(self, account_id: int) -> None:
+        """Count one request in memory; written to disk by flush_usage()."""
+        account = self._accounts.get(account_id)
+        if account is not None:
+            account.last_used_at = datetime.now(timezone.utc)
+            account.request_count += 1
+            account.invalidate_cache()
+            self._usage_dirty = True
+    
+    async def flush_usage(self) -> bool:
+        """
+        Write buffered usage statistics to the accounts file.
+        
+        Many requests are coalesced into one file write instead of rewriting
+        the whole file per request.
+        
+        Returns:
+            True if the file was written
+        """
+        if not self._usage_dirty:
+            return False
+        await self._save_to_file()
+        return True
     
     async def list_accounts(self) -> List[dict]:
         """List all accounts with status."""
-        async with self._lock:
-            return [
-                {
-                    **account.to_dict(),
-                    "status": self._get_account_status(account),
-                }
-                for account in self._accounts.values()
-            ]
-    
-    def _get_account_status(self, account: LocalAccount) -> str:
+        now_ts = time.time()
+        return [
+            {
+                **account.to_dict(),
+                "status": self._get_account_status(account, now_ts),
+            }
+            for account in self._accounts.values()
+        ]
+    
+    def _get_account_status(self, account: LocalAccount, now_ts: Optional[float] = None) -> str:
         """Get human-readable account status."""
+        if now_ts is None:
+            now_ts = time.time()
         if not account.is_active:
             return "inactive"
         if not account.access_token:
             return "no_token"
-        if not account.is_token_valid():
+        if not account.is_token_valid(now_ts):
             return "expired"
-        if account.is_token_expiring_soon():
+        if account.is_token_expiring_soon(now_ts=now_ts):
             return "expiring_soon"
         return "healthy"
     
     async def get_account(self, account_id: int) -> Optional[dict]:
         """Get a single account by ID."""
-        async with self._lock:
-            account = self._accounts.get(account_id)
-            if not account:
-                return None
-            return {
-                **account.to_dict(),
-                "status": self._get_account_status(account),
-            }
+        account = self._accounts.get(account_id)
+        if not account:
+            return None
+        return {
+            **account.to_dict(),
+            "status": self._get_account_status(account),
+        }
     
     async def update_account(
         self,
@@ -382,18 +595,18 @@ class LocalAccountManager:
                 account.is_active = is_active
                 if is_active:
                     if account_id not in self._account_ids:
-                        self._account_ids.append(account_id)
+                        self._account_ids[account_id] = None
                         self._auth_managers[account_id] = self._create_auth_manager(account)
                 else:
-                    if account_id in self._account_ids:
-                        self._account_ids.remove(account_id)
+                    self._account_ids.pop(account_id, None)
                     if account_id in self._auth_managers:
                         del self._auth_managers[account_id]
-                    if self._current_index >= len(self._account_ids):
-                        self._current_index = 0
+                self._rebuild_snapshot()
             
             account.updated_at = datetime.now(timezone.utc)
-            self._save_to_file()
+            account.invalidate_cache()
+        
+        await self._save_to_file()
         
         logger.info(f"Updated account id={account_id}")
         return True
@@ -420,6 +633,7 @@ class LocalAccountManager:
             if profile_arn:
                 account.profile_arn = profile_arn
             account.updated_at = datetime.now(timezone.utc)
+            account.invalidate_cache()
             
             # Update auth manager
             if account_id in self._auth_managers:
@@ -431,18 +645,27 @@ class LocalAccountManager:
                     auth_manager._expires_at = expires_at
                 if profile_arn:
                     auth_manager._profile_arn = profile_arn
-            
-            self._save_to_file()
+        
+        await self._save_to_file()
         
         return True
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Returns or creates the shared HTTP client used for token refresh.
+        
+        Reusing pooled keep-alive connections avoids a TLS handshake per refresh.
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=30,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+        return self._http
+    
     async def refresh_account_token(self, account_id: int) -> tuple[bool, str]:
         """Refresh token for a specific account."""
-        import httpx
-        
-        async with self._lock:
-            account = self._accounts.get(account_id)
-        
+        account = self._accounts.get(account_id)
         if not account:
             return False, "Account not found"
         
@@ -456,23 +679,18 @@ class LocalAccountManager:
     
     async def _refresh_social_token(self, account: LocalAccount) -> tuple[bool, str]:
         """Refresh token using Kiro's refresh endpoint."""
-        import httpx
-        
         if not account.refresh_token:
             return False, "No refresh token available"
         
-        region = account.region or "us-east-1"
-        refresh_url = f"https://prod.{region}.auth.desktop.kiro.dev/refreshToken"
+        refresh_url = get_kiro_refresh_url(account.region or "us-east-1")
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(
-                    refresh_url,
-                    json={"refreshToken": account.refresh_token},
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await self._get_http_client().post(
+                refresh_url,
+                json={"refreshToken": account.refresh_token},
+            )
+            response.raise_for_status()
+            data = response.json()
             
             new_access_token = data.get("accessToken")
             new_refresh_token = data.get("refreshToken")
@@ -482,10 +700,7 @@ class LocalAccountManager:
             if not new_access_token:
                 return False, "No access token in response"
             
-            expires_at = datetime.fromtimestamp(
-                datetime.now(timezone.utc).timestamp() + expires_in,
-                tz=timezone.utc
-            )
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
             
             await self.update_account_tokens(
                 account.id,
@@ -504,31 +719,26 @@ class LocalAccountManager:
     
     async def _refresh_idc_token(self, account: LocalAccount) -> tuple[bool, str]:
         """Refresh token using AWS SSO OIDC API."""
-        import httpx
-        
         if not account.refresh_token:
             return False, "No refresh token available"
         
         if not account.client_id or not account.client_secret:
             return False, "Missing client credentials"
         
-        region = account.region or "us-east-1"
-        token_url = f"https://oidc.{region}.amazonaws.com/token"
+        token_url = get_aws_sso_oidc_url(account.region or "us-east-1")
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(
-                    token_url,
-                    json={
-                        "clientId": account.client_id,
-                        "clientSecret": account.client_secret,
-                        "grantType": "refresh_token",
-                        "refreshToken": account.refresh_token,
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await self._get_http_client().post(
+                token_url,
+                json={
+                    "clientId": account.client_id,
+                    "clientSecret": account.client_secret,
+                    "grantType": "refresh_token",
+                    "refreshToken": account.refresh_token,
+                },
+            )
+            response.raise_for_status()
+            data = response.json()
             
             new_access_token = data.get("accessToken")
             new_refresh_token = data.get("refreshToken")
@@ -537,10 +747,7 @@ class LocalAccountManager:
             if not new_access_token:
                 return False, "No access token in response"
             
-            expires_at = datetime.fromtimestamp(
-                datetime.now(timezone.utc).timestamp() + expires_in,
-                tz=timezone.utc
-            )
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
             
             await self.update_account_tokens(
                 account.id,
@@ -559,19 +766,37 @@ class LocalAccountManager:
     
     async def refresh_all_tokens(self, force: bool = False) -> int:
         """Refresh tokens for all accounts."""
-        refreshed = 0
+        now_ts = time.time()
+        to_refresh = [
+            account for account in self._accounts.values()
+            if account.is_active and (force or account.is_token_expiring_soon(TOKEN_REFRESH_THRESHOLD, now_ts))
+        ]
         
-        async with self._lock:
-            accounts = list(self._accounts.values())
+        if not to_refresh:
+            return 0
+        
+        # Refresh concurrently, bounded per region so one auth endpoint is not burst
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        async def _refresh_one(account: LocalAccount) -> tuple[bool, str]:
+            region = account.region or "us-east-1"
+            semaphore = semaphores.get(region)
+            if semaphore is None:
+                semaphore = semaphores[region] = asyncio.Semaphore(self.REFRESH_CONCURRENCY)
+            async with semaphore:
+                return await self.refresh_account_token(account.id)
         
-        for account in accounts:
-            if account.is_active and (force or account.is_token_expiring_soon(TOKEN_REFRESH_THRESHOLD)):
-                try:
-                    success, _ = await self.refresh_account_token(account.id)
-                    if success:
-                        refreshed += 1
-                except Exception as e:
-                    logger.error(f"Failed to refresh token for account id={account.id}: {e}")
+        results = await asyncio.gather(
+            *(_refresh_one(account) for account in to_refresh),
+            return_exceptions=True,
+        )
+        
+        refreshed = 0
+        for account, result in zip(to_refresh, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to refresh token for account id={account.id}: {result}")
+            elif result[0]:
+                refreshed += 1
         
         return refreshed
     
@@ -595,18 +820,40 @@ class LocalAccountManager:
             except Exception as e:
                 logger.error(f"Error in auto-refresh loop: {e}")
     
+    async def _usage_flush_loop(self) -> None:
+        """Background task to periodically persist buffered usage stats."""
+        while True:
+            try:
+                await asyncio.sleep(self.USAGE_FLUSH_INTERVAL)
+                await self.flush_usage()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in usage flush loop: {e}")
+    
     def start_auto_refresh(self) -> None:
-        """Start background task to auto-refresh tokens."""
+        """Start background tasks to auto-refresh tokens and flush usage stats."""
         if self._refresh_task is None:
             self._refresh_task = asyncio.create_task(self._auto_refresh_loop())
             logger.info("Started auto-refresh background task (local storage)")
+        if self._usage_flush_task is None:
+            self._usage_flush_task = asyncio.create_task(self._usage_flush_loop())
     
     def stop_auto_refresh(self) -> None:
-        """Stop background refresh task."""
+        """Stop background refresh and usage flush tasks."""
         if self._refresh_task:
             self._refresh_task.cancel()
             self._refresh_task = None
             logger.info("Stopped auto-refresh background task")
+        if self._usage_flush_task:
+            self._usage_flush_task.cancel()
+            self._usage_flush_task = None
+    
+    async def aclose(self) -> None:
+        """Persist pending usage stats and close the HTTP client. Call after stop_auto_refresh()."""
+        await self.flush_usage()
+        if self._http and not self._http.is_closed:
+            await self._http.aclose()
     
     @property
     def account_count(self) -> int:
@@ -615,5 +862,4 @@ class LocalAccountManager:
     
     async def get_total_requests(self) -> int:
         """Get total request count across all accounts."""
-        async with self._lock:
-            return sum(acc.request_count for acc in self._accounts.values())
+        return sum(acc.request_count for acc in self._accounts.values())
@@ -28,6 +28,7 @@ Contains all API endpoints:
 
 import json
 from datetime import datetime, timezone
+from typing import Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, Security
@@ -65,6 +66,34 @@ except ImportError:
 # --- Security scheme ---
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
+_BEARER_PREFIX = "Bearer "
+_BEARER_LEN = len(_BEARER_PREFIX)
+
+# Shared 401 detail for every auth failure (never varies per request)
+_INVALID_API_KEY_DETAIL = "Invalid or missing API Key"
+
+
+def extract_bearer_token(auth_header: Optional[str]) -> Optional[str]:
+    """
+    Extract the token from an "Authorization: Bearer <token>" header value.
+    
+    Trailing whitespace is stripped only when present, so the common case
+    is a single slice without extra allocations.
+    
+    Args:
+        auth_header: Authorization header value
+    
+    Returns:
+        Token string, or None if the header is missing or not a Bearer header
+    """
+    if not auth_header or auth_header[:_BEARER_LEN] != _BEARER_PREFIX:
+        return None
+    
+    token = auth_header[_BEARER_LEN:]
+    if token and token[-1] in " \t\r\n":
+        token = token.rstrip()
+    return token or None
+
 
 async def verify_api_key(auth_header: str = Security(api_key_header)) -> bool:
     """
@@ -82,14 +111,14 @@ async def verify_api_key(auth_header: str = Security(api_key_header)) -> bool:
     Raises:
         HTTPException: 401 if key is invalid or missing
     """
-    if not auth_header or not auth_header.startswith("Bearer "):
+    key = extract_bearer_token(auth_header)
+    if key is None:
         logger.warning("Access attempt with missing or malformed API key.")
-        raise HTTPException(status_code=401, detail="Invalid or missing API Key")
+        raise HTTPException(status_code=401, detail=_INVALID_API_KEY_DETAIL)
     
-    key = auth_header[7:]  # Remove "Bearer " prefix
     if not validate_api_key(key):
         logger.warning("Access attempt with invalid API key.")
-        raise HTTPException(status_code=401, detail="Invalid or missing API Key")
+        raise HTTPException(status_code=401, detail=_INVALID_API_KEY_DETAIL)
     
     return True
 
@@ -14,12 +14,12 @@ Provides endpoints for:
 """
 
 import asyncio
-import hashlib
+import hmac
 import os
 import platform
 import secrets
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -32,19 +32,20 @@ from fastapi.security import APIKeyHeader
 from loguru import logger
 from pydantic import BaseModel
 
-from kiro_gateway.config import SECRET_KEY, APP_VERSION
+from kiro_gateway.config import SECRET_KEY, APP_VERSION, read_config_file
 import json as json_module
 from kiro_gateway.accounts import AccountManager
 
 
-# Session tokens with file persistence
-_sessions: dict = {}
+# Session tokens with file persistence (LRU-ordered, bounded)
+_sessions: "OrderedDict[str, dict]" = OrderedDict()
 SESSION_EXPIRY_DAYS = 30  # Extended to 30 days for longer persistence
+MAX_SESSIONS = 1024  # Oldest sessions are evicted beyond this limit
 SESSION_FILE = Path(__file__).parent.parent / ".sessions.json"
 _session_cleanup_task: Optional[asyncio.Task] = None
 
-# Server start time for uptime calculation
-_server_start_time = time.time()
+# Server start time for uptime calculation (monotonic, immune to wall-clock jumps)
+_server_start_time = time.monotonic()
 
 # Log buffer for SSE streaming
 _log_buffer: deque = deque(maxlen=500)
@@ -55,6 +56,9 @@ _system_info_cache: Optional[Dict[str, Any]] = None
 _system_info_cache_time: float = 0
 SYSTEM_INFO_CACHE_TTL = 5  # seconds
 
+# Encoded once for constant-time comparison on login
+_SECRET_KEY_BYTES = str(SECRET_KEY).encode("utf-8")
+
 
 def _load_sessions_from_file():
     """Load sessions from persistent storage on startup."""
@@ -70,10 +74,10 @@ def _load_sessions_from_file():
                 # Parse expires_at and filter out expired sessions
                 expires_at = datetime.fromisoformat(session["expires_at"])
                 if expires_at > now:
-                    _sessions[token] = {
+                    _store_session(token, {
                         "created_at": datetime.fromisoformat(session["created_at"]),
                         "expires_at": expires_at,
-                    }
+                    })
                     loaded += 1
             
             if loaded > 0:
@@ -82,6 +86,14 @@ def _load_sessions_from_file():
         logger.warning(f"Could not load sessions from file: {e}")
 
 
+def _store_session(token: str, session: dict) -> None:
+    """Insert a session as most recently used, evicting the oldest beyond MAX_SESSIONS."""
+    _sessions[token] = session
+    _sessions.move_to_end(token)
+    while len(_sessions) > MAX_SESSIONS:
+        _sessions.popitem(last=False)
+
+
 def _save_sessions_to_file():
     """Save sessions to persistent storage."""
     try:
@@ -107,7 +119,7 @@ async def cleanup_expired_sessions():
             expired = [token for token, session in _sessions.items() 
                       if now > session["expires_at"]]
             for token in expired:
-                del _sessions[token]
+                _sessions.pop(token, None)
             if expired:
                 logger.debug(f"Cleaned up {len(expired)} expired sessions")
                 _save_sessions_to_file()
@@ -173,11 +185,6 @@ def _generate_session_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def _hash_key(key: str) -> str:
-    """Hash a key for comparison."""
-    return hashlib.sha256(key.encode()).hexdigest()
-
-
 async def verify_session(
     session_token: str = Depends(session_header),
     token: Optional[str] = None,
@@ -194,9 +201,10 @@ async def verify_session(
         raise HTTPException(status_code=401, detail="Invalid session token")
     
     if datetime.now(timezone.utc) > session["expires_at"]:
-        del _sessions[actual_token]
+        _sessions.pop(actual_token, None)
         raise HTTPException(status_code=401, detail="Session expired")
     
+    _sessions.move_to_end(actual_token)
     return True
 
 
@@ -263,18 +271,19 @@ async def login(request: LoginRequest):
     
     Returns a session token valid for 24 hours.
     """
-    if request.secret_key != SECRET_KEY:
+    if not hmac.compare_digest(request.secret_key.encode("utf-8"), _SECRET_KEY_BYTES):
         logger.warning("Failed login attempt")
         return LoginResponse(success=False, message="Invalid secret key")
     
     # Generate session token
     session_token = _generate_session_token()
-    expires_at = datetime.now(timezone.utc) + timedelta(days=SESSION_EXPIRY_DAYS)
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=SESSION_EXPIRY_DAYS)
     
-    _sessions[session_token] = {
-        "created_at": datetime.now(timezone.utc),
+    _store_session(session_token, {
+        "created_at": now,
         "expires_at": expires_at,
-    }
+    })
     
     # Persist sessions to file
     _save_sessions_to_file()
@@ -290,8 +299,7 @@ async def login(request: LoginRequest):
 @webui_router.post("/logout")
 async def logout(session_token: str = Depends(session_header)):
     """Logout and invalidate session."""
-    if session_token in _sessions:
-        del _sessions[session_token]
+    if session_token and _sessions.pop(session_token, None) is not None:
         _save_sessions_to_file()
     return {"success": True, "message": "Logged out"}
 
@@ -300,7 +308,7 @@ async def logout(session_token: str = Depends(session_header)):
 
 def _get_system_info_uncached() -> Dict[str, Any]:
     """Get system information without caching."""
-    uptime_seconds = int(time.time() - _server_start_time)
+    uptime_seconds = int(time.monotonic() - _server_start_time)
     hours, remainder = divmod(uptime_seconds, 3600)
     minutes, seconds = divmod(remainder, 60)
     
@@ -352,7 +360,7 @@ async def get_system_info(_: bool = Depends(verify_session)):
     """Get system information with caching."""
     global _system_info_cache, _system_info_cache_time
     
-    now = time.time()
+    now = time.monotonic()
     if _system_info_cache is None or (now - _system_info_cache_time) > SYSTEM_INFO_CACHE_TTL:
         _system_info_cache = _get_system_info_uncached()
         _system_info_cache_time = now
@@ -365,17 +373,13 @@ async def get_system_info(_: bool = Depends(verify_session)):
 @webui_router.get("/api/config")
 async def get_config(_: bool = Depends(verify_session)):
     """Get current configuration."""
-    config_path = Path("config.yml")
-    
-    if not config_path.exists():
-        return {"config": {}, "exists": False}
-    
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f) or {}
+        # Parsed once per file version, so UI polling doesn't re-read the YAML
+        safe_config = read_config_file("config.yml")
+        if safe_config is None:
+            return {"config": {}, "exists": False}
         
-        # Mask sensitive values
-        safe_config = config.copy()
+        # Mask sensitive values (read_config_file returns a private copy)
         if "secret_key" in safe_config:
             safe_config["secret_key"] = "***" + safe_config["secret_key"][-4:] if len(safe_config.get("secret_key", "")) > 4 else "****"
         if "refresh_token" in safe_config and safe_config["refresh_token"]:
@@ -719,7 +723,7 @@ def _verify_session_token(token: Optional[str]) -> bool:
     if not session:
         return False
     if datetime.now(timezone.utc) > session["expires_at"]:
-        del _sessions[token]
+        _sessions.pop(token, None)
         return False
     return True
 
@@ -1237,8 +1241,8 @@ async def delete_api_key(key_prefix: str, _: bool = Depends(verify_session)):
     if not api_key:
         raise HTTPException(status_code=404, detail="API key not found")
     
-    # Don't allow deleting the last key
-    if manager.key_count <= 1:
+    # Don't allow deleting the last key (live count: other workers may have changed keys)
+    if manager.count_keys()[0] <= 1:
         raise HTTPException(status_code=400, detail="Cannot delete the last API key")
     
     manager.delete_key(api_key.key)
@@ -1262,7 +1266,7 @@ async def update_api_key(
         raise HTTPException(status_code=404, detail="API key not found")
     
     # Don't allow deactivating the last active key
-    if update.is_active is False and manager.active_key_count <= 1:
+    if update.is_active is False and manager.count_keys()[1] <= 1:
         raise HTTPException(status_code=400, detail="Cannot deactivate the last active API key")
     
     manager.update_key(api_key.key, name=update.name, is_active=update.is_active)
@@ -1284,7 +1288,7 @@ async def toggle_api_key(key_prefix: str, _: bool = Depends(verify_session)):
     new_status = not api_key.is_active
     
     # Don't allow deactivating the last active key
-    if not new_status and manager.active_key_count <= 1:
+    if not new_status and manager.count_keys()[1] <= 1:
         raise HTTPException(status_code=400, detail="Cannot deactivate the last active API key")
     
     manager.update_key(api_key.key, is_active=new_status)
@@ -323,6 +323,10 @@ async def lifespan(app: FastAPI):
     if app.state.account_manager:
         app.state.account_manager.stop_auto_refresh()
     
+    # Flush buffered usage stats
+    if app.state.account_manager:
+        await app.state.account_manager.aclose()
+    
     # Close database connection (only if using PostgreSQL)
     if not app.state.using_local_storage:
         await close_database()
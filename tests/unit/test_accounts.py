@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for AccountManager.
+Tests round-robin selection, single-flight token refresh, buffered usage stats
+and credential loading. The database is replaced by a fake session factory.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from kiro_gateway.accounts import AccountManager
+from kiro_gateway.database import KiroAccount
+
+
+class _AsyncRows:
+    """Async iterator over rows, as returned by AsyncSession.stream_scalars()."""
+    
+    def __init__(self, rows):
+        self._rows = iter(rows)
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _FakeSession:
+    """Minimal AsyncSession stand-in that records executed statements."""
+    
+    def __init__(self, factory):
+        self._factory = factory
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def begin(self):
+        return self
+    
+    async def execute(self, stmt):
+        self._factory.statements.append(stmt)
+        if self._factory.execute_error is not None:
+            raise self._factory.execute_error
+        return self._factory.execute_result
+    
+    async def stream_scalars(self, stmt):
+        self._factory.statements.append(stmt)
+        return _AsyncRows(self._factory.rows)
+    
+    async def commit(self):
+        pass
+
+
+class _FakeSessionFactory:
+    """Callable returning _FakeSession objects that share recorded state."""
+    
+    def __init__(self):
+        self.statements = []
+        self.rows = []
+        self.execute_result = Mock()
+        self.execute_error = None
+    
+    def __call__(self):
+        return _FakeSession(self)
+
+
+def _make_account(account_id: int, expires_in: int = 3600) -> KiroAccount:
+    """Creates a transient KiroAccount with a token valid for expires_in seconds."""
+    return KiroAccount(
+        id=account_id,
+        name=f"account-{account_id}",
+        auth_method="social",
+        access_token=f"access-{account_id}",
+        refresh_token=f"refresh-{account_id}",
+        region="us-east-1",
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        is_active=True,
+        request_count=0,
+    )
+
+
+def _compile(stmt) -> str:
+    """Renders a statement as PostgreSQL SQL."""
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.fixture
+def session_factory():
+    """Creates a fake session factory."""
+    return _FakeSessionFactory()
+
+
+@pytest.fixture
+def manager(session_factory):
+    """Creates an AccountManager on the fake session factory."""
+    return AccountManager(session_factory)
+
+
+class TestAccountManagerRoundRobin:
+    """Tests for lock-free round-robin selection."""
+    
+    @pytest.mark.asyncio
+    async def test_selection_is_fair_after_reload(self, manager, session_factory):
+        """
+        What it does: Verifies that accounts are selected evenly before and after a reload.
+        Purpose: Ensure the snapshot rebuilt by load_accounts() drops removed accounts and keeps rotation fair.
+        """
+        print("Setup: Loading 3 accounts...")
+        session_factory.rows = [_make_account(i) for i in (1, 2, 3)]
+        assert await manager.load_accounts() == 3
+        
+        print("Action: Selecting 30 times...")
+        picks = Counter([id(await manager.get_next_account()) for _ in range(30)])
+        assert sorted(picks.values()) == [10, 10, 10]
+        
+        print("Action: Reloading with one account removed and one added...")
+        session_factory.rows = [_make_account(i) for i in (2, 3, 4)]
+        assert await manager.load_accounts() == 3
+        
+        reloaded = {id(am) for am in manager._auth_managers.values()}
+        picks = Counter([id(await manager.get_next_account()) for _ in range(30)])
+        
+        print(f"Picks after reload: {sorted(picks.values())}")
+        assert set(picks) == reloaded
+        assert sorted(picks.values()) == [10, 10, 10]
+    
+    @pytest.mark.asyncio
+    async def test_no_accounts_returns_none(self, manager):
+        """
+        What it does: Verifies that get_next_account() returns None without accounts.
+        Purpose: Ensure callers can fall back to the default auth manager.
+        """
+        assert await manager.get_next_account() is None
+    
+    @pytest.mark.asyncio
+    async def test_load_undefers_credentials(self, manager, session_factory):
+        """
+        What it does: Verifies that load_accounts() selects the deferred token columns.
+        Purpose: Ensure auth managers are built with tokens instead of lazy-loading them.
+        """
+        session_factory.rows = [_make_account(1)]
+        await manager.load_accounts()
+        
+        sql = _compile(session_factory.statements[0])
+        assert "kiro_accounts.access_token" in sql
+        assert "kiro_accounts.refresh_token" in sql
+
+
+class TestAccountManagerSingleFlightRefresh:
+    """Tests for coalescing concurrent refreshes of the same account."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_call(self, manager):
+        """
+        What it does: Verifies that concurrent refreshes of one account run the refresh once.
+        Purpose: Ensure inline, sweep and manual refreshes collapse into one HTTP call.
+        """
+        release = asyncio.Event()
+        
+        async def slow_refresh(account_id, expiring_before=None):
+            await release.wait()
+            return True, "Token refreshed successfully"
+        
+        manager._load_and_refresh_account = AsyncMock(side_effect=slow_refresh)
+        
+        print("Action: Starting 5 concurrent refreshes...")
+        callers = [asyncio.create_task(manager.refresh_account_token(1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+        
+        print(f"Results: {results}")
+        assert manager._load_and_refresh_account.await_count == 1
+        assert all(result == (True, "Token refreshed successfully") for result in results)
+        assert manager._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_not_cached(self, manager):
+        """
+        What it does: Verifies that a failed refresh is raised to every waiter and then forgotten.
+        Purpose: Ensure a failure does not stick: the next call starts a new refresh.
+        """
+        release = asyncio.Event()
+        
+        async def failing_refresh(account_id, expiring_before=None):
+            await release.wait()
+            raise RuntimeError("upstream down")
+        
+        manager._load_and_refresh_account = AsyncMock(side_effect=failing_refresh)
+        
+        callers = [asyncio.create_task(manager.refresh_account_token(1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        
+        print(f"Results: {results}")
+        assert manager._load_and_refresh_account.await_count == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert manager._inflight == {}
+        
+        print("Action: Retrying after the failure...")
+        manager._load_and_refresh_account = AsyncMock(return_value=(True, "ok"))
+        assert await manager.refresh_account_token(1) == (True, "ok")
+        manager._load_and_refresh_account.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_failed_inline_refresh_backs_off(self, manager, session_factory):
+        """
+        What it does: Verifies that a failed inline refresh is not retried on the next selections.
+        Purpose: Ensure a broken account does not trigger a refresh request per selection.
+        """
+        session_factory.rows = [_make_account(1, expires_in=60)]
+        await manager.load_accounts()
+        manager._load_and_refresh_account = AsyncMock(return_value=(False, "invalid_grant"))
+        
+        print("Action: Selecting the expiring account repeatedly...")
+        for _ in range(5):
+            await manager.get_next_account()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        
+        assert manager._load_and_refresh_account.await_count == 1
+        assert manager._fresh_until[1] > time.monotonic()
+        assert manager._refresh_failures[1] == 1
+
+
+class TestAccountManagerFlushUsage:
+    """Tests for buffered usage stats."""
+    
+    @pytest.mark.asyncio
+    async def test_flush_sums_buffered_counts(self, manager, session_factory):
+        """
+        What it does: Verifies that flush_usage() writes summed per-account counts in one statement.
+        Purpose: Ensure N requests become one UPDATE instead of N.
+        """
+        for account_id in (1, 1, 1, 2):
+            manager._record_usage(account_id)
+        
+        print("Action: Flushing usage...")
+        assert await manager.flush_usage() == 2
+        
+        assert len(session_factory.statements) == 1
+        compiled = session_factory.statements[0].compile(dialect=postgresql.dialect())
+        # VALUES rows are bound as param_1.. (id, inc, ts per row)
+        params = [value for name, value in compiled.params.items() if name.startswith("param_")]
+        rows = {params[i]: params[i + 1] for i in range(0, len(params), 3)}
+        print(f"Flushed rows: {rows}")
+        assert rows == {1: 3, 2: 1}
+        assert manager._pending_usage == {}
+    
+    @pytest.mark.asyncio
+    async def test_flush_failure_keeps_counts(self, manager, session_factory):
+        """
+        What it does: Verifies that a failed flush puts the counts back into the buffer.
+        Purpose: Ensure usage is retried on the next flush instead of lost.
+        """
+        manager._record_usage(1)
+        manager._record_usage(1)
+        session_factory.execute_error = RuntimeError("connection lost")
+        
+        assert await manager.flush_usage() == 0
+        assert manager._pending_usage[1][0] == 2
+        
+        print("Action: Recording more usage and flushing successfully...")
+        manager._record_usage(1)
+        session_factory.execute_error = None
+        assert await manager.flush_usage() == 1
+        assert manager._pending_usage == {}
+    
+    @pytest.mark.asyncio
+    async def test_flush_without_usage_skips_database(self, manager, session_factory):
+        """
+        What it does: Verifies that flush_usage() does nothing when no usage was recorded.
+        Purpose: Ensure idle flush ticks do not touch the database.
+        """
+        assert await manager.flush_usage() == 0
+        assert session_factory.statements == []
+
+
+class TestAccountManagerDeferredCredentials:
+    """Tests for loading the deferred token columns."""
+    
+    def test_plain_select_skips_tokens(self):
+        """
+        What it does: Verifies that selecting KiroAccount does not fetch the token columns.
+        Purpose: Ensure listings never load token blobs.
+        """
+        sql = _compile(select(KiroAccount))
+        assert "access_token" not in sql
+        assert "refresh_token" not in sql
+    
+    @pytest.mark.asyncio
+    async def test_refresh_path_loads_tokens(self, manager, session_factory):
+        """
+        What it does: Verifies that the refresh path re-reads the account with its tokens.
+        Purpose: Ensure refreshes use the current refresh token, loaded in the same query.
+        """
+        account = _make_account(1)
+        session_factory.execute_result = Mock()
+        session_factory.execute_result.scalar_one_or_none.return_value = account
+        manager._refresh_loaded_account = AsyncMock(return_value=(True, "ok"))
+        
+        assert await manager.refresh_account_token(1) == (True, "ok")
+        
+        sql = _compile(session_factory.statements[0])
+        assert "kiro_accounts.access_token" in sql
+        assert "kiro_accounts.refresh_token" in sql
+        manager._refresh_loaded_account.assert_awaited_once_with(account)
+    
+    @pytest.mark.asyncio
+    async def test_sweep_skips_account_refreshed_meanwhile(self, manager, session_factory):
+        """
+        What it does: Verifies that the sweep skips an account whose re-read token is no longer expiring.
+        Purpose: Ensure a token rotated by an inline refresh is not refreshed again with stale data.
+        """
+        account = _make_account(1, expires_in=7200)
+        session_factory.execute_result = Mock()
+        session_factory.execute_result.scalars.return_value.all.return_value = [1]
+        session_factory.execute_result.scalar_one_or_none.return_value = account
+        manager._refresh_loaded_account = AsyncMock(return_value=(True, "ok"))
+        manager.REFRESH_PACING = 0
+        
+        assert await manager.refresh_all_tokens(threshold=600) == 0
+        manager._refresh_loaded_account.assert_not_awaited()
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for API key storage.
+Tests the APIKey model, the JSON file backend and the SQLite backend.
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from kiro_gateway.api_keys import (
+    APIKey,
+    LocalAPIKeyManager,
+    SQLiteAPIKeyManager,
+    UNNAMED_KEY_NAME,
+    generate_api_key,
+)
+
+
+def _write_keys_file(path, keys):
+    """Writes an api_keys.json file with the given key dictionaries."""
+    path.write_text(json.dumps({"keys": keys}), encoding="utf-8")
+
+
+class TestAPIKey:
+    """Tests for the APIKey model."""
+    
+    def test_null_name_falls_back_to_default(self):
+        """
+        What it does: Verifies that a stored "name": null gives the default name.
+        Purpose: Ensure one malformed entry does not fail the load of the key file.
+        """
+        api_key = APIKey.from_storage_dict({"key": generate_api_key(), "name": None})
+        
+        print(f"Name: {api_key.name!r}")
+        assert api_key.name == UNNAMED_KEY_NAME
+    
+    def test_storage_dict_round_trip(self):
+        """
+        What it does: Verifies that to_storage_dict() and from_storage_dict() round-trip a key.
+        Purpose: Ensure saved keys load back unchanged.
+        """
+        original = APIKey(key=generate_api_key(), name="Client", request_count=7)
+        restored = APIKey.from_storage_dict(original.to_storage_dict())
+        
+        assert restored.to_storage_dict() == original.to_storage_dict()
+
+
+class TestLocalAPIKeyManagerLoad:
+    """Tests for loading api_keys.json."""
+    
+    def test_key_with_null_name_keeps_all_keys(self, tmp_path):
+        """
+        What it does: Verifies that a file with a "name": null entry loads every key.
+        Purpose: Ensure the load does not fall back to default keys and overwrite the file.
+        """
+        print("Setup: Writing a key file with a null name...")
+        storage_file = tmp_path / "api_keys.json"
+        stored = [
+            {"key": generate_api_key(), "name": None, "request_count": 3},
+            {"key": generate_api_key(), "name": "Client", "is_active": False},
+        ]
+        _write_keys_file(storage_file, stored)
+        
+        print("Action: Loading the keys...")
+        manager = LocalAPIKeyManager(str(storage_file))
+        
+        keys = {item["key"]: item for item in manager.list_keys(mask=False)}
+        print(f"Loaded keys: {list(keys.values())}")
+        assert set(keys) == {item["key"] for item in stored}
+        assert keys[stored[0]["key"]]["name"] == UNNAMED_KEY_NAME
+        assert keys[stored[0]["key"]]["request_count"] == 3
+        assert manager.count_keys() == (2, 1)
+        
+        print("Verification: The file was not rewritten with default keys...")
+        manager.flush()
+        on_disk = json.loads(storage_file.read_text(encoding="utf-8"))
+        assert {item["key"] for item in on_disk["keys"]} == set(keys)
+    
+    def test_missing_file_creates_default_keys(self, tmp_path):
+        """
+        What it does: Verifies that a missing key file creates two default keys.
+        Purpose: Ensure the first run leaves the gateway usable.
+        """
+        manager = LocalAPIKeyManager(str(tmp_path / "api_keys.json"))
+        manager.flush()
+        
+        assert manager.count_keys() == (2, 2)
+        assert (tmp_path / "api_keys.json").exists()
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """Creates a SQLiteAPIKeyManager on a fresh database (no JSON import)."""
+    return SQLiteAPIKeyManager(
+        str(tmp_path / "api_keys.db"),
+        import_file=str(tmp_path / "missing.json"),
+    )
+
+
+def _first_key(manager) -> str:
+    """Returns the full value of the first stored key."""
+    return manager.list_keys(mask=False)[0]["key"]
+
+
+class TestSQLiteAPIKeyManagerValidation:
+    """Tests for key validation against the SQLite store."""
+    
+    def test_validates_existing_active_key(self, sqlite_manager):
+        """
+        What it does: Verifies that a stored active key is accepted.
+        Purpose: Ensure the default keys created on first start are usable.
+        """
+        assert sqlite_manager.validate_key(_first_key(sqlite_manager)) is True
+    
+    def test_rejects_unknown_and_malformed_keys(self, sqlite_manager):
+        """
+        What it does: Verifies that unknown and malformed keys are rejected.
+        Purpose: Ensure only stored keys authenticate.
+        """
+        assert sqlite_manager.validate_key(generate_api_key()) is False
+        assert sqlite_manager.validate_key("not-a-key") is False
+        assert sqlite_manager.validate_key("") is False
+    
+    def test_deactivated_key_is_rejected_immediately(self, sqlite_manager):
+        """
+        What it does: Verifies that a key stops validating as soon as it is deactivated.
+        Purpose: Ensure revocation is not delayed by any validation cache.
+        """
+        key = _first_key(sqlite_manager)
+        assert sqlite_manager.validate_key(key) is True
+        
+        print("Action: Deactivating the key...")
+        assert sqlite_manager.update_key(key, is_active=False) is True
+        
+        assert sqlite_manager.validate_key(key) is False
+        assert sqlite_manager.count_keys() == (2, 1)
+    
+    def test_deleted_key_is_rejected(self, sqlite_manager):
+        """
+        What it does: Verifies that a deleted key no longer validates.
+        Purpose: Ensure delete_key() revokes access and updates the counts.
+        """
+        key = _first_key(sqlite_manager)
+        assert sqlite_manager.delete_key(key) is True
+        
+        assert sqlite_manager.validate_key(key) is False
+        assert sqlite_manager.delete_key(key) is False
+        assert sqlite_manager.count_keys() == (1, 1)
+
+
+class TestSQLiteAPIKeyManagerUsage:
+    """Tests for buffered usage stats."""
+    
+    def test_flush_writes_summed_counts(self, sqlite_manager):
+        """
+        What it does: Verifies that flush_usage() writes the buffered request counts per key.
+        Purpose: Ensure N validations become one write with the summed counts.
+        """
+        keys = [item["key"] for item in sqlite_manager.list_keys(mask=False)]
+        for key in (keys[0], keys[0], keys[0], keys[1]):
+            assert sqlite_manager.validate_key(key)
+        
+        print("Action: Flushing usage...")
+        assert sqlite_manager.flush_usage() == 2
+        assert sqlite_manager.flush_usage() == 0
+        
+        stored = {key: sqlite_manager.get_key(key) for key in keys}
+        print(f"Counts: {[(api_key.name, api_key.request_count) for api_key in stored.values()]}")
+        assert stored[keys[0]].request_count == 3
+        assert stored[keys[1]].request_count == 1
+        assert stored[keys[0]].last_used_at is not None
+        assert stored[keys[0]].last_used_at.tzinfo is not None
+    
+    def test_failed_flush_keeps_counts(self, sqlite_manager):
+        """
+        What it does: Verifies that counts are kept when the usage write fails.
+        Purpose: Ensure usage is retried on the next flush instead of lost.
+        """
+        key = _first_key(sqlite_manager)
+        sqlite_manager.validate_key(key)
+        sqlite_manager.validate_key(key)
+        
+        with patch.object(sqlite_manager, "_write_usage", side_effect=RuntimeError("disk full")):
+            assert sqlite_manager.flush_usage() == 0
+        
+        sqlite_manager.validate_key(key)
+        assert sqlite_manager.flush_usage() == 1
+        assert sqlite_manager.get_key(key).request_count == 3
+
+
+class TestSQLiteAPIKeyManagerPrefixLookup:
+    """Tests for get_key_by_prefix()."""
+    
+    def test_finds_key_by_prefix(self, sqlite_manager):
+        """
+        What it does: Verifies that a key is found by a prefix of its value.
+        Purpose: Ensure the web UI can address keys by their masked prefix.
+        """
+        key = _first_key(sqlite_manager)
+        
+        assert sqlite_manager.get_key_by_prefix(key[:12]).key == key
+    
+    def test_prefix_must_match(self, sqlite_manager):
+        """
+        What it does: Verifies that non-matching prefixes and LIKE wildcards find nothing.
+        Purpose: Ensure web UI actions never hit a key that does not start with the prefix.
+        """
+        assert sqlite_manager.get_key_by_prefix("sk-zzzzzzzz") is None
+        assert sqlite_manager.get_key_by_prefix("sk-%") is None
+        assert sqlite_manager.get_key_by_prefix("sk-_") is None
+
+
+class TestSQLiteAPIKeyManagerSeeding:
+    """Tests for the first start of the SQLite store."""
+    
+    def test_empty_database_gets_default_keys(self, sqlite_manager):
+        """
+        What it does: Verifies that a new database without api_keys.json gets two default keys.
+        Purpose: Ensure the first run leaves the gateway usable.
+        """
+        names = sorted(item["name"] for item in sqlite_manager.list_keys())
+        assert names == ["Default Key 1", "Default Key 2"]
+    
+    def test_imports_keys_from_json(self, tmp_path):
+        """
+        What it does: Verifies that keys from an existing api_keys.json are imported on first start.
+        Purpose: Ensure switching to SQLite keeps the keys clients already use.
+        """
+        print("Setup: Writing api_keys.json...")
+        import_file = tmp_path / "api_keys.json"
+        stored = [
+            {"key": generate_api_key(), "name": "Client A", "request_count": 5},
+            {"key": generate_api_key(), "name": None, "is_active": False},
+        ]
+        _write_keys_file(import_file, stored)
+        
+        print("Action: Opening a new SQLite store...")
+        manager = SQLiteAPIKeyManager(str(tmp_path / "api_keys.db"), import_file=str(import_file))
+        
+        keys = {item["key"]: item for item in manager.list_keys(mask=False)}
+        assert set(keys) == {item["key"] for item in stored}
+        assert keys[stored[0]["key"]]["request_count"] == 5
+        assert keys[stored[1]["key"]]["name"] == UNNAMED_KEY_NAME
+        assert manager.count_keys() == (2, 1)
+        
+        print("Verification: Reopening does not import again...")
+        reopened = SQLiteAPIKeyManager(str(tmp_path / "api_keys.db"), import_file=str(import_file))
+        assert reopened.count_keys() == (2, 1)
+    
+    @pytest.mark.parametrize("import_count", [0, 3])
+    def test_concurrent_first_start_seeds_once(self, tmp_path, import_count):
+        """
+        What it does: Verifies that workers starting together seed the database exactly once.
+        Purpose: Ensure simultaneous workers neither fail on duplicate imports nor each add default keys.
+        """
+        db_file = str(tmp_path / "api_keys.db")
+        import_file = tmp_path / "api_keys.json"
+        if import_count:
+            _write_keys_file(
+                import_file,
+                [{"key": generate_api_key(), "name": f"Key {i}"} for i in range(import_count)],
+            )
+        
+        errors = []
+        
+        def start_worker():
+            try:
+                SQLiteAPIKeyManager(db_file, import_file=str(import_file))
+            except Exception as e:
+                errors.append(e)
+        
+        print("Action: Starting 8 workers at once...")
+        workers = [threading.Thread(target=start_worker) for _ in range(8)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        
+        print(f"Errors: {errors}")
+        assert errors == []
+        expected = import_count or 2
+        assert SQLiteAPIKeyManager(db_file, import_file=str(import_file)).count_keys() == (expected, expected)
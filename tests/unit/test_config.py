@@ -10,6 +10,7 @@ import tempfile
 import os
 from unittest.mock import patch
 from pathlib import Path
+from collections.abc import Mapping
 
 import yaml
 
@@ -52,26 +53,135 @@ class TestYamlConfigLoading:
             assert result == {}
         finally:
             os.unlink(temp_path)
+    
+    def test_load_yaml_config_rereads_changed_file(self):
+        """Verifies that a modified config file is parsed again, not served from cache."""
+        from kiro_gateway.config import _load_yaml_config
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
+            f.write("log_level: DEBUG\n")
+            temp_path = f.name
+        
+        try:
+            assert _load_yaml_config(temp_path).get("log_level") == "DEBUG"
+            
+            with open(temp_path, 'w') as f:
+                f.write("log_level: WARNING\nextra: 1\n")
+            
+            result = _load_yaml_config(temp_path)
+            assert result.get("log_level") == "WARNING"
+            assert result.get("extra") == 1
+        finally:
+            os.unlink(temp_path)
+    
+    def test_load_yaml_config_result_is_not_shared(self):
+        """Verifies that mutating a returned config does not affect later loads."""
+        from kiro_gateway.config import _load_yaml_config
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
+            f.write("log_level: DEBUG\n")
+            temp_path = f.name
+        
+        try:
+            first = _load_yaml_config(temp_path)
+            first["log_level"] = "CHANGED"
+            assert _load_yaml_config(temp_path).get("log_level") == "DEBUG"
+        finally:
+            os.unlink(temp_path)
+    
+    def test_read_config_file_nested_sections_are_not_shared(self):
+        """Verifies that mutating a nested section of a returned config does not affect later reads."""
+        from kiro_gateway.config import read_config_file
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
+            f.write("oauth:\n  poll_interval: 5\n")
+            temp_path = f.name
+        
+        try:
+            first = read_config_file(temp_path)
+            first["oauth"]["poll_interval"] = 99
+            assert read_config_file(temp_path)["oauth"]["poll_interval"] == 5
+        finally:
+            os.unlink(temp_path)
+    
+    def test_read_config_file_returns_none_for_missing_file(self):
+        """Verifies that read_config_file returns None for a missing file."""
+        from kiro_gateway.config import read_config_file
+        
+        assert read_config_file("/nonexistent/path/config.yml") is None
+    
+    def test_read_config_file_raises_on_invalid_yaml(self):
+        """Verifies that read_config_file reports parse errors instead of hiding them."""
+        from kiro_gateway.config import read_config_file
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as f:
+            f.write("invalid: yaml: content: [")
+            temp_path = f.name
+        
+        try:
+            with pytest.raises(yaml.YAMLError):
+                read_config_file(temp_path)
+        finally:
+            os.unlink(temp_path)
 
 
-class TestGetConfigValue:
-    """Tests for _get_config_value helper function."""
+class TestGatewaySettings:
+    """Tests for the typed config.yml model."""
+    
+    def test_defaults_for_empty_config(self):
+        """Verifies that an empty config yields the documented defaults."""
+        from kiro_gateway.config import _GatewaySettings
+        
+        settings = _GatewaySettings.model_validate({})
+        assert settings.log_level == "INFO"
+        assert settings.first_token_timeout == 15.0
+        assert settings.debug_mode == "off"
+        assert settings.oauth.callback_port_start == 19876
+    
+    def test_values_are_coerced(self):
+        """Verifies that string/number values from YAML are coerced to field types."""
+        from kiro_gateway.config import _GatewaySettings
+        
+        settings = _GatewaySettings.model_validate({
+            "log_level": "warning",
+            "first_token_timeout": "30",
+            "tool_description_max_length": "5000",
+            "secret_key": 12345,
+            "debug_mode": "ALL",
+        })
+        assert settings.log_level == "WARNING"
+        assert settings.first_token_timeout == 30.0
+        assert settings.tool_description_max_length == 5000
+        assert settings.secret_key == "12345"
+        assert settings.debug_mode == "all"
+    
+    def test_null_values_fall_back_to_defaults(self):
+        """Verifies that keys left empty in YAML use defaults."""
+        from kiro_gateway.config import _GatewaySettings
+        
+        settings = _GatewaySettings.model_validate(
+            yaml.safe_load("secret_key:\noauth:\n  poll_interval:\n")
+        )
+        assert settings.secret_key == "admin123"
+        assert settings.oauth.poll_interval == 5
     
-    def test_get_config_value_returns_value(self):
-        """Verifies that existing key returns its value."""
-        from kiro_gateway.config import _get_config_value
+    def test_unknown_debug_mode_falls_back_to_off(self):
+        """Verifies that an invalid debug_mode is treated as off."""
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {"log_level": "DEBUG", "timeout": 30}
-        assert _get_config_value(config, "log_level") == "DEBUG"
-        assert _get_config_value(config, "timeout") == 30
+        assert _GatewaySettings.model_validate({"debug_mode": "verbose"}).debug_mode == "off"
     
-    def test_get_config_value_returns_default(self):
-        """Verifies that missing key returns default."""
-        from kiro_gateway.config import _get_config_value
+    def test_unquoted_yaml_booleans_are_accepted(self):
+        """Verifies that unquoted off/no/yes (YAML 1.1 booleans) do not fail validation."""
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {"log_level": "DEBUG"}
-        assert _get_config_value(config, "missing_key", "default") == "default"
-        assert _get_config_value(config, "another_missing") is None
+        for raw in ("off", "no", "yes"):
+            config = yaml.safe_load(f"debug_mode: {raw}\nsecret_key: {raw}\n")
+            assert isinstance(config["debug_mode"], bool)
+            
+            settings = _GatewaySettings.model_validate(config)
+            assert settings.debug_mode == "off"
+            assert settings.secret_key == str(config["secret_key"])
 
 
 class TestLogLevelConfig:
@@ -79,28 +189,22 @@ class TestLogLevelConfig:
     
     def test_log_level_uppercase_conversion(self):
         """Verifies LOG_LEVEL conversion to uppercase."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {"log_level": "warning"}
-        log_level = str(_get_config_value(config, "log_level", "INFO")).upper()
-        assert log_level == "WARNING"
+        assert _GatewaySettings.model_validate({"log_level": "warning"}).log_level == "WARNING"
     
     def test_log_level_default_is_info(self):
         """Verifies that LOG_LEVEL defaults to INFO."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {}
-        log_level = str(_get_config_value(config, "log_level", "INFO")).upper()
-        assert log_level == "INFO"
+        assert _GatewaySettings.model_validate({}).log_level == "INFO"
     
     def test_log_level_from_config(self):
         """Verifies loading LOG_LEVEL from config."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
         for level in ["DEBUG", "TRACE", "ERROR", "CRITICAL", "WARNING"]:
-            config = {"log_level": level}
-            log_level = str(_get_config_value(config, "log_level", "INFO")).upper()
-            assert log_level == level
+            assert _GatewaySettings.model_validate({"log_level": level}).log_level == level
 
 
 class TestToolDescriptionMaxLengthConfig:
@@ -108,27 +212,23 @@ class TestToolDescriptionMaxLengthConfig:
     
     def test_default_tool_description_max_length(self):
         """Verifies the default value for TOOL_DESCRIPTION_MAX_LENGTH."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {}
-        value = int(_get_config_value(config, "tool_description_max_length", 10000))
-        assert value == 10000
+        assert _GatewaySettings.model_validate({}).tool_description_max_length == 10000
     
     def test_tool_description_max_length_from_config(self):
         """Verifies loading TOOL_DESCRIPTION_MAX_LENGTH from config."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {"tool_description_max_length": 5000}
-        value = int(_get_config_value(config, "tool_description_max_length", 10000))
-        assert value == 5000
+        settings = _GatewaySettings.model_validate({"tool_description_max_length": 5000})
+        assert settings.tool_description_max_length == 5000
     
     def test_tool_description_max_length_zero(self):
         """Verifies that 0 is a valid value."""
-        from kiro_gateway.config import _get_config_value
+        from kiro_gateway.config import _GatewaySettings
         
-        config = {"tool_description_max_length": 0}
-        value = int(_get_config_value(config, "tool_description_max_length", 10000))
-        assert value == 0
+        settings = _GatewaySettings.model_validate({"tool_description_max_length": 0})
+        assert settings.tool_description_max_length == 0
 
 
 class TestTimeoutConfigurationWarning:
@@ -193,16 +293,31 @@ class TestConfigConstants:
         """Verifies MODEL_MAPPING is defined."""
         from kiro_gateway.config import MODEL_MAPPING
         
-        assert isinstance(MODEL_MAPPING, dict)
+        assert isinstance(MODEL_MAPPING, Mapping)
         assert len(MODEL_MAPPING) > 0
     
+    def test_model_mapping_is_read_only(self):
+        """Verifies MODEL_MAPPING cannot be modified at runtime."""
+        from kiro_gateway.config import MODEL_MAPPING
+        
+        with pytest.raises(TypeError):
+            MODEL_MAPPING["new-model"] = "new-model"
+    
     def test_available_models_exists(self):
         """Verifies AVAILABLE_MODELS is defined."""
         from kiro_gateway.config import AVAILABLE_MODELS
         
-        assert isinstance(AVAILABLE_MODELS, list)
+        assert isinstance(AVAILABLE_MODELS, tuple)
         assert len(AVAILABLE_MODELS) > 0
     
+    def test_is_available_model(self):
+        """Verifies is_available_model matches AVAILABLE_MODELS membership."""
+        from kiro_gateway.config import AVAILABLE_MODELS, is_available_model
+        
+        for model in AVAILABLE_MODELS:
+            assert is_available_model(model)
+        assert not is_available_model("unknown-model")
+    
     def test_get_internal_model_id(self):
         """Verifies get_internal_model_id function."""
         from kiro_gateway.config import get_internal_model_id, MODEL_MAPPING
@@ -10,6 +10,14 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from kiro_gateway.debug_logger import DebugLogger
+
+
+def _create_logger(debug_dir: Path) -> DebugLogger:
+    """Создаёт DebugLogger с DEBUG_DIR, указывающим на debug_dir."""
+    with patch('kiro_gateway.debug_logger.DEBUG_DIR', str(debug_dir)):
+        return DebugLogger()
+
 
 class TestDebugLoggerModeOff:
     """Тесты для режима DEBUG_MODE=off."""
@@ -21,19 +29,13 @@ class TestDebugLoggerModeOff:
         """
         print("Настройка: Режим off...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'off'):
-            with patch('kiro_gateway.debug_logger.DEBUG_DIR', str(tmp_path / "debug_logs")):
-                # Пересоздаём экземпляр с новыми настройками
-                from kiro_gateway.debug_logger import DebugLogger
-                logger = DebugLogger.__new__(DebugLogger)
-                logger._initialized = False
-                logger.__init__()
-                logger.debug_dir = tmp_path / "debug_logs"
-                
-                print("Действие: Вызов prepare_new_request...")
-                logger.prepare_new_request()
-                
-                print(f"Проверяем, что директория не создана...")
-                assert not (tmp_path / "debug_logs").exists()
+            logger = _create_logger(tmp_path / "debug_logs")
+            
+            print("Действие: Вызов prepare_new_request...")
+            logger.prepare_new_request()
+            
+            print(f"Проверяем, что директория не создана...")
+            assert not (tmp_path / "debug_logs").exists()
     
     def test_log_request_body_does_nothing(self, tmp_path):
         """
@@ -42,11 +44,7 @@ class TestDebugLoggerModeOff:
         """
         print("Настройка: Режим off...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'off'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = tmp_path / "debug_logs"
+            logger = _create_logger(tmp_path / "debug_logs")
             
             print("Действие: Вызов log_request_body...")
             logger.log_request_body(b'{"test": "data"}')
@@ -63,24 +61,26 @@ class TestDebugLoggerModeAll:
         Что он делает: Проверяет, что prepare_new_request очищает директорию в режиме all.
         Цель: Убедиться, что старые логи удаляются.
         """
-        print("Настройка: Режим all, создаём старый файл...")
+        print("Настройка: Режим all, создаём файлы прошлого запроса...")
         debug_dir = tmp_path / "debug_logs"
         debug_dir.mkdir()
-        old_file = debug_dir / "old_file.txt"
+        old_file = debug_dir / "request_body.json"
         old_file.write_text("old content")
+        old_stream = debug_dir / "response_stream_raw.txt"
+        old_stream.write_text("old chunks")
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов prepare_new_request...")
             logger.prepare_new_request()
             
-            print(f"Проверяем, что старый файл удалён...")
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
+            print(f"Проверяем, что старые файлы удалены...")
             assert not old_file.exists()
+            assert not old_stream.exists()
             print(f"Проверяем, что директория существует...")
             assert debug_dir.exists()
     
@@ -94,16 +94,15 @@ class TestDebugLoggerModeAll:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_request_body...")
             test_data = b'{"model": "test", "messages": []}'
             logger.log_request_body(test_data)
             
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
             print(f"Проверяем, что файл создан...")
             file_path = debug_dir / "request_body.json"
             assert file_path.exists()
@@ -122,16 +121,15 @@ class TestDebugLoggerModeAll:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_kiro_request_body...")
             test_data = b'{"conversationState": {}}'
             logger.log_kiro_request_body(test_data)
             
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
             print(f"Проверяем, что файл создан...")
             file_path = debug_dir / "kiro_request_body.json"
             assert file_path.exists()
@@ -146,20 +144,68 @@ class TestDebugLoggerModeAll:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_raw_chunk дважды...")
             logger.log_raw_chunk(b'chunk1')
             logger.log_raw_chunk(b'chunk2')
             
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
             print(f"Проверяем содержимое файла...")
             file_path = debug_dir / "response_stream_raw.txt"
             content = file_path.read_bytes()
             assert content == b'chunk1chunk2'
+    
+    def test_discard_buffers_flushes_stream_writes(self, tmp_path):
+        """
+        Что он делает: Проверяет, что после discard_buffers все чанки стрима попадают в файл.
+        Цель: Убедиться, что закрытие файлов в конце запроса не теряет чанки из очереди.
+        """
+        print("Настройка: Режим all...")
+        debug_dir = tmp_path / "debug_logs"
+        debug_dir.mkdir()
+        
+        with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
+            logger = _create_logger(debug_dir)
+            
+            print("Действие: Запись чанков и завершение запроса...")
+            for i in range(100):
+                logger.log_modified_chunk(f"chunk{i};".encode())
+            logger.discard_buffers()
+            
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
+            print(f"Проверяем содержимое файла...")
+            content = (debug_dir / "response_stream_modified.txt").read_bytes()
+            assert content == b"".join(f"chunk{i};".encode() for i in range(100))
+    
+    def test_new_request_does_not_get_previous_chunks(self, tmp_path):
+        """
+        Что он делает: Проверяет, что очистка директории выполняется после записи чанков прошлого запроса.
+        Цель: Убедиться, что без ожидания в event loop чанки прошлого запроса не попадают в файлы нового.
+        """
+        print("Настройка: Режим all...")
+        debug_dir = tmp_path / "debug_logs"
+        debug_dir.mkdir()
+        
+        with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
+            logger = _create_logger(debug_dir)
+            
+            print("Действие: Первый запрос, затем сразу второй...")
+            for i in range(100):
+                logger.log_raw_chunk(f"old{i};".encode())
+            logger.discard_buffers()
+            logger.prepare_new_request()
+            logger.log_raw_chunk(b"new;")
+            
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
+            print(f"Проверяем, что в файле только чанки второго запроса...")
+            assert (debug_dir / "response_stream_raw.txt").read_bytes() == b"new;"
 
 
 class TestDebugLoggerModeErrors:
@@ -174,11 +220,7 @@ class TestDebugLoggerModeErrors:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_request_body...")
             test_data = b'{"test": "buffered"}'
@@ -199,11 +241,7 @@ class TestDebugLoggerModeErrors:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             # Заполняем буферы
             logger.log_request_body(b'{"request": "body"}')
@@ -235,11 +273,7 @@ class TestDebugLoggerModeErrors:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             logger.log_request_body(b'{"test": "data"}')
             
@@ -261,11 +295,7 @@ class TestDebugLoggerModeErrors:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             logger.log_request_body(b'{"test": "data"}')
             logger.log_raw_chunk(b'chunk')
@@ -289,15 +319,14 @@ class TestDebugLoggerModeErrors:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов flush_on_error...")
             logger.flush_on_error(400, "Bad Request")
             
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
             print(f"Проверяем, что error_info.json создан...")
             assert (debug_dir / "error_info.json").exists()
             
@@ -319,11 +348,7 @@ class TestDebugLoggerLogErrorInfo:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_error_info...")
             logger.log_error_info(500, "Internal Server Error")
@@ -346,11 +371,7 @@ class TestDebugLoggerLogErrorInfo:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_error_info...")
             logger.log_error_info(404, "Not Found")
@@ -368,11 +389,7 @@ class TestDebugLoggerLogErrorInfo:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'off'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_error_info...")
             logger.log_error_info(500, "Error")
@@ -391,10 +408,7 @@ class TestDebugLoggerHelperMethods:
         """
         print("Настройка: Режим errors...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
+            logger = DebugLogger()
             
             print(f"Проверяем _is_enabled()...")
             assert logger._is_enabled() is True
@@ -406,10 +420,7 @@ class TestDebugLoggerHelperMethods:
         """
         print("Настройка: Режим all...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
+            logger = DebugLogger()
             
             print(f"Проверяем _is_enabled()...")
             assert logger._is_enabled() is True
@@ -421,10 +432,7 @@ class TestDebugLoggerHelperMethods:
         """
         print("Настройка: Режим off...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'off'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
+            logger = DebugLogger()
             
             print(f"Проверяем _is_enabled()...")
             assert logger._is_enabled() is False
@@ -436,10 +444,7 @@ class TestDebugLoggerHelperMethods:
         """
         print("Настройка: Режим all...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
+            logger = DebugLogger()
             
             print(f"Проверяем _is_immediate_write()...")
             assert logger._is_immediate_write() is True
@@ -451,10 +456,7 @@ class TestDebugLoggerHelperMethods:
         """
         print("Настройка: Режим errors...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
+            logger = DebugLogger()
             
             print(f"Проверяем _is_immediate_write()...")
             assert logger._is_immediate_write() is False
@@ -473,20 +475,39 @@ class TestDebugLoggerJsonHandling:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
-            print("Действие: Вызов log_request_body с JSON...")
-            logger.log_request_body(b'{"key":"value"}')
+            print("Действие: Вызов log_request_body с JSON (DEBUG_PRETTY_JSON=True)...")
+            with patch('kiro_gateway.debug_logger.DEBUG_PRETTY_JSON', True):
+                logger.log_request_body(b'{"key":"value"}')
+                logger.close_streams(wait=True)
             
             print(f"Проверяем форматирование...")
             content = (debug_dir / "request_body.json").read_text()
             # Должен быть отформатирован с отступами
             assert "  " in content or "\n" in content
     
+    def test_log_request_body_writes_raw_bytes_by_default(self, tmp_path):
+        """
+        Что он делает: Проверяет, что без DEBUG_PRETTY_JSON тело пишется как есть.
+        Цель: Убедиться, что по умолчанию JSON не разбирается и не переформатируется.
+        """
+        print("Настройка: Режим all...")
+        debug_dir = tmp_path / "debug_logs"
+        debug_dir.mkdir()
+        
+        with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
+            logger = _create_logger(debug_dir)
+            
+            print("Действие: Вызов log_request_body с JSON...")
+            test_data = b'{"key":"value","messages":[]}'
+            with patch('kiro_gateway.debug_logger.DEBUG_PRETTY_JSON', False):
+                logger.log_request_body(test_data)
+                logger.close_streams(wait=True)
+            
+            print(f"Проверяем, что данные записаны байт в байт...")
+            assert (debug_dir / "request_body.json").read_bytes() == test_data
+    
     def test_log_request_body_handles_invalid_json(self, tmp_path):
         """
         Что он делает: Проверяет обработку невалидного JSON.
@@ -497,16 +518,15 @@ class TestDebugLoggerJsonHandling:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            logger = DebugLogger.__new__(DebugLogger)
-            logger._initialized = False
-            logger.__init__()
-            logger.debug_dir = debug_dir
+            logger = _create_logger(debug_dir)
             
             print("Действие: Вызов log_request_body с невалидным JSON...")
             invalid_data = b'not a json {{'
             logger.log_request_body(invalid_data)
             
+            print("Действие: Ожидание фоновой записи...")
+            logger.close_streams(wait=True)
+            
             print(f"Проверяем, что данные записаны как есть...")
             content = (debug_dir / "request_body.json").read_bytes()
             assert content == invalid_data
@@ -524,11 +544,7 @@ class TestDebugLoggerAppLogsCapture:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = debug_dir
+            dbg_logger = _create_logger(debug_dir)
             
             print("Действие: Вызов prepare_new_request...")
             dbg_logger.prepare_new_request()
@@ -548,13 +564,9 @@ class TestDebugLoggerAppLogsCapture:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
             from loguru import logger as loguru_logger
             
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = debug_dir
+            dbg_logger = _create_logger(debug_dir)
             
             # Настраиваем захват логов
             dbg_logger.prepare_new_request()
@@ -586,12 +598,7 @@ class TestDebugLoggerAppLogsCapture:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = debug_dir
+            dbg_logger = _create_logger(debug_dir)
             
             # Настраиваем захват логов
             dbg_logger.prepare_new_request()
@@ -602,6 +609,9 @@ class TestDebugLoggerAppLogsCapture:
             print("Действие: Вызов discard_buffers...")
             dbg_logger.discard_buffers()
             
+            print("Действие: Ожидание фоновой записи...")
+            dbg_logger.close_streams(wait=True)
+            
             print(f"Проверяем, что app_logs.txt создан...")
             app_logs_file = debug_dir / "app_logs.txt"
             assert app_logs_file.exists()
@@ -619,12 +629,7 @@ class TestDebugLoggerAppLogsCapture:
         debug_dir = tmp_path / "debug_logs"
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'errors'):
-            from kiro_gateway.debug_logger import DebugLogger
-            
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = debug_dir
+            dbg_logger = _create_logger(debug_dir)
             
             # Настраиваем захват логов
             dbg_logger.prepare_new_request()
@@ -645,12 +650,7 @@ class TestDebugLoggerAppLogsCapture:
         """
         print("Настройка: Режим all...")
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = tmp_path / "debug_logs"
+            dbg_logger = _create_logger(tmp_path / "debug_logs")
             
             # Настраиваем захват логов
             dbg_logger.prepare_new_request()
@@ -673,12 +673,7 @@ class TestDebugLoggerAppLogsCapture:
         debug_dir.mkdir()
         
         with patch('kiro_gateway.debug_logger.DEBUG_MODE', 'all'):
-            from kiro_gateway.debug_logger import DebugLogger
-            
-            dbg_logger = DebugLogger.__new__(DebugLogger)
-            dbg_logger._initialized = False
-            dbg_logger.__init__()
-            dbg_logger.debug_dir = debug_dir
+            dbg_logger = _create_logger(debug_dir)
             
             # НЕ пишем ничего в буфер
             
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for LocalAccountManager.
+Tests reloading the accounts file and coalesced file saves.
+Accounts files are written to tmp_path.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from kiro_gateway.local_storage import LocalAccountManager
+
+
+def _account_data(account_id=1, **overrides):
+    """Returns a stored account dictionary with test values."""
+    data = {
+        "id": account_id,
+        "name": f"Account {account_id}",
+        "auth_method": "social",
+        "access_token": f"access-{account_id}",
+        "refresh_token": f"refresh-{account_id}",
+        "region": "us-east-1",
+        "expires_at": "2099-01-01T00:00:00+00:00",
+        "is_active": True,
+        "request_count": 0,
+    }
+    data.update(overrides)
+    return data
+
+
+def _write_accounts_file(path, accounts):
+    """Writes an accounts file with the given account dictionaries."""
+    next_id = max((item["id"] for item in accounts if isinstance(item, dict)), default=0) + 1
+    path.write_text(json.dumps({"next_id": next_id, "accounts": accounts}), encoding="utf-8")
+
+
+async def _load_manager(path, accounts):
+    """Writes the accounts file and returns a manager that loaded it."""
+    _write_accounts_file(path, accounts)
+    manager = LocalAccountManager(str(path))
+    await manager.load_accounts()
+    return manager
+
+
+class TestLocalAccountManagerReload:
+    """Tests for reloading an already loaded accounts file."""
+    
+    @pytest.mark.asyncio
+    async def test_reload_keeps_unsaved_usage(self, tmp_path):
+        """
+        What it does: Verifies that reloading keeps request counts not yet written to the file.
+        Purpose: Ensure a reload does not reset usage stats or replace loaded accounts.
+        """
+        print("Setup: Loading one account and counting 3 requests...")
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1)])
+        account = manager._accounts[1]
+        auth_manager = manager._auth_managers[1]
+        for _ in range(3):
+            await manager.get_next_account()
+        last_used_at = account.last_used_at
+        
+        print("Action: Reloading the unchanged file...")
+        await manager.load_accounts()
+        
+        print(f"Request count: {manager._accounts[1].request_count}")
+        assert manager._accounts[1] is account
+        assert manager._auth_managers[1] is auth_manager
+        assert account.request_count == 3
+        assert account.last_used_at == last_used_at
+    
+    @pytest.mark.asyncio
+    async def test_reload_updates_tokens_of_existing_manager(self, tmp_path):
+        """
+        What it does: Verifies that changed tokens in the file reach the existing auth manager.
+        Purpose: Ensure a reload refreshes credentials without rebuilding managers.
+        """
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1)])
+        auth_manager = manager._auth_managers[1]
+        
+        print("Action: Reloading with new tokens...")
+        _write_accounts_file(storage_file, [_account_data(1, access_token="new-access", refresh_token="new-refresh")])
+        await manager.load_accounts()
+        
+        assert manager._auth_managers[1] is auth_manager
+        assert auth_manager._access_token == "new-access"
+        assert auth_manager._refresh_token == "new-refresh"
+    
+    @pytest.mark.asyncio
+    async def test_region_change_rebuilds_auth_manager(self, tmp_path):
+        """
+        What it does: Verifies that a changed region creates a new auth manager.
+        Purpose: Ensure requests go to the hosts of the new region.
+        """
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1)])
+        old_auth_manager = manager._auth_managers[1]
+        
+        print("Action: Reloading with region eu-west-1...")
+        _write_accounts_file(storage_file, [_account_data(1, region="eu-west-1")])
+        await manager.load_accounts()
+        
+        new_auth_manager = manager._auth_managers[1]
+        print(f"Region: {new_auth_manager._region}")
+        assert new_auth_manager is not old_auth_manager
+        assert new_auth_manager._region == "eu-west-1"
+        assert await manager.get_next_account() is new_auth_manager
+    
+    @pytest.mark.asyncio
+    async def test_malformed_file_leaves_state_untouched(self, tmp_path):
+        """
+        What it does: Verifies that a file with a malformed entry changes no loaded account.
+        Purpose: Ensure a failed reload never leaves accounts half-updated.
+        """
+        print("Setup: Loading two accounts...")
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1), _account_data(2)])
+        accounts = dict(manager._accounts)
+        auth_managers = dict(manager._auth_managers)
+        
+        print("Action: Reloading a file whose second entry is malformed...")
+        _write_accounts_file(
+            storage_file,
+            [_account_data(1, name="Renamed", region="eu-west-1", refresh_token="new-refresh"), "garbage"],
+        )
+        await manager.load_accounts()
+        
+        print(f"Account 1: {manager._accounts[1].name} ({manager._accounts[1].region})")
+        assert manager._accounts == accounts
+        assert manager._auth_managers == auth_managers
+        assert manager._accounts[1].name == "Account 1"
+        assert manager._accounts[1].region == "us-east-1"
+        assert manager._auth_managers[1]._refresh_token == "refresh-1"
+        assert manager.account_count == 2
+
+
+class TestLocalAccountManagerSave:
+    """Tests for writing the accounts file."""
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_saves_write_latest_snapshot(self, tmp_path):
+        """
+        What it does: Verifies that saves queued behind a slow write share one write with the latest state.
+        Purpose: Ensure coalescing never drops a change that was made while a write was in flight.
+        """
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1)])
+        
+        payloads = []
+        write_file = manager._write_file
+        
+        def slow_write(payload):
+            time.sleep(0.05)
+            payloads.append(payload)
+            write_file(payload)
+        
+        manager._write_file = slow_write
+        
+        print("Action: Updating tokens 5 times while the first write is in flight...")
+        first_save = asyncio.create_task(manager._save_to_file())
+        await asyncio.sleep(0)
+        updates = [
+            asyncio.create_task(manager.update_account_tokens(1, access_token=f"access-v{i}"))
+            for i in range(5)
+        ]
+        await asyncio.gather(first_save, *updates)
+        
+        print(f"Writes: {len(payloads)}")
+        assert len(payloads) == 2
+        on_disk = json.loads(storage_file.read_text(encoding="utf-8"))
+        assert on_disk["accounts"][0]["access_token"] == "access-v4"
+    
+    @pytest.mark.asyncio
+    async def test_flush_usage_writes_counts(self, tmp_path):
+        """
+        What it does: Verifies that flush_usage() writes buffered request counts once.
+        Purpose: Ensure usage stats survive a restart without a write per request.
+        """
+        storage_file = tmp_path / "accounts.json"
+        manager = await _load_manager(storage_file, [_account_data(1)])
+        for _ in range(4):
+            await manager.get_next_account()
+        
+        assert await manager.flush_usage() is True
+        assert await manager.flush_usage() is False
+        
+        on_disk = json.loads(storage_file.read_text(encoding="utf-8"))
+        assert on_disk["accounts"][0]["request_count"] == 4
+        assert on_disk["accounts"][0]["last_used_at"] is not None
@@ -12,7 +12,7 @@ from datetime import datetime, timezone
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
-from kiro_gateway.routes import verify_api_key, router
+from kiro_gateway.routes import verify_api_key, extract_bearer_token, router
 from kiro_gateway.config import APP_VERSION, AVAILABLE_MODELS
 
 
@@ -98,6 +98,44 @@ class TestVerifyApiKey:
         assert exc_info.value.status_code == 401
 
 
+class TestExtractBearerToken:
+    """Тесты функции extract_bearer_token."""
+    
+    def test_extracts_token_from_bearer_header(self):
+        """
+        Что он делает: Проверяет извлечение токена из заголовка Bearer.
+        Цель: Убедиться, что префикс "Bearer " отрезается.
+        """
+        print("Действие: Извлечение токена...")
+        result = extract_bearer_token("Bearer sk-test123")
+        
+        print(f"Сравниваем результат: Ожидалось 'sk-test123', Получено {result}")
+        assert result == "sk-test123"
+    
+    def test_strips_trailing_whitespace(self):
+        """
+        Что он делает: Проверяет удаление пробельных символов в конце токена.
+        Цель: Убедиться, что "Bearer key \r\n" даёт чистый ключ.
+        """
+        print("Действие: Извлечение токена с пробелами в конце...")
+        result = extract_bearer_token("Bearer sk-test123 \r\n")
+        
+        print(f"Сравниваем результат: Ожидалось 'sk-test123', Получено {result}")
+        assert result == "sk-test123"
+    
+    def test_returns_none_for_missing_or_malformed_header(self):
+        """
+        Что он делает: Проверяет обработку отсутствующего и некорректного заголовка.
+        Цель: Убедиться, что без префикса Bearer возвращается None.
+        """
+        print("Действие: Проверка None, пустой строки, Basic и пустого Bearer...")
+        assert extract_bearer_token(None) is None
+        assert extract_bearer_token("") is None
+        assert extract_bearer_token("Basic abc") is None
+        assert extract_bearer_token("Bearer ") is None
+        assert extract_bearer_token("Bearer   ") is None
+
+
 class TestRootEndpoint:
     """Тесты эндпоинта /."""
     